@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Article Bundling Script
+Concatenates Help Site JSON articles into a single JSONL file that
+json_to_sql.py can stream instead of opening every article separately
+"""
+
+import json
+import sys
+from pathlib import Path
+
+ARTICLES_JSONL = 'articles.jsonl'
+
+
+def build_jsonl(articles_dir, output_path):
+    """Write one article per line, tagged with its source filename"""
+    json_files = sorted(Path(articles_dir).glob("*.json"))
+
+    if not json_files:
+        print(f"Warning: No JSON files found in {articles_dir}")
+
+    written_count = 0
+    skipped_count = 0
+
+    with open(output_path, 'w', encoding='utf-8') as out:
+        for json_file in json_files:
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Error reading {json_file.name}: {e}")
+                skipped_count += 1
+                continue
+
+            data['_filename'] = json_file.name
+            out.write(json.dumps(data, ensure_ascii=False))
+            out.write('\n')
+            written_count += 1
+
+    return written_count, skipped_count
+
+
+def main():
+    """Main execution function"""
+
+    # Default paths
+    articles_dir = Path(__file__).parent / 'data' / 'articles'
+
+    # Allow command-line arguments
+    if len(sys.argv) > 1:
+        articles_dir = Path(sys.argv[1])
+    output_path = articles_dir / ARTICLES_JSONL
+    if len(sys.argv) > 2:
+        output_path = Path(sys.argv[2])
+
+    # Check if articles directory exists
+    if not articles_dir.exists():
+        print(f"Error: Articles directory not found at {articles_dir}")
+        sys.exit(1)
+
+    print(f"Bundling JSON articles from: {articles_dir}")
+
+    written, skipped = build_jsonl(articles_dir, output_path)
+
+    print(f"\n✓ Bundle completed successfully!")
+    print(f"  - Written: {written} articles")
+    print(f"  - Skipped: {skipped} files")
+    print(f"  - Output: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
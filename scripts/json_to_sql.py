@@ -8,10 +8,61 @@ import json
 import sqlite3
 import sys
 import re
+from functools import partial
 from pathlib import Path
 from datetime import datetime
 from html.parser import HTMLParser
 
+try:
+    # C HTML parser, much faster than html.parser on large article bodies
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+
+# One-shot import: the database is rebuildable, so trade durability for speed.
+# page_size only takes effect on a freshly created database file.
+BULK_LOAD_PRAGMAS = [
+    "PRAGMA page_size=32768",
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-262144",
+    "PRAGMA locking_mode=EXCLUSIVE",
+]
+
+# Bundle written by build_jsonl.py; streamed instead of one file per article
+ARTICLES_JSONL = 'articles.jsonl'
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+INSERT_ARTICLE_SQL = """
+    INSERT INTO help_articles (
+        article_title,
+        breadcrumbs,
+        intended_users,
+        path,
+        article_body,
+        filename
+    ) VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_FTS_SQL = """
+    INSERT INTO help_articles_fts (
+        rowid,
+        article_title,
+        article_text,
+        breadcrumbs,
+        intended_users
+    ) VALUES (?, ?, ?, ?, ?)
+"""
+
 
 class HTMLTextExtractor(HTMLParser):
     """Extract plain text from HTML for search indexing"""
@@ -31,15 +82,50 @@ def extract_text_from_html(html_content):
     if not html_content:
         return ""
     
-    parser = HTMLTextExtractor()
     try:
+        if LexborHTMLParser is not None:
+            text = LexborHTMLParser(html_content).text(separator=' ')
+            return WHITESPACE_RE.sub(' ', text).strip()
+        parser = HTMLTextExtractor()
         parser.feed(html_content)
         return parser.get_text()
-    except:
-        # Fallback: simple regex-based extraction
-        text = re.sub(r'<[^>]+>', ' ', html_content)
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+    except Exception:
+        # Unparseable HTML would not index meaningfully anyway
+        return ""
+
+
+def load_json_file(json_file):
+    """Read and parse a single article file"""
+    with open(json_file, 'rb') as f:
+        return json_loads(f.read())
+
+
+def iter_article_sources(articles_path):
+    """
+    Yield (name, loader) pairs, preferring the JSONL bundle when present.
+    A bundle older than any article file is stale and ignored.
+    """
+    jsonl_path = articles_path / ARTICLES_JSONL
+    json_files = sorted(articles_path.glob("*.json"))
+    
+    if jsonl_path.is_file():
+        bundle_mtime = jsonl_path.stat().st_mtime
+        if any(json_file.stat().st_mtime > bundle_mtime for json_file in json_files):
+            print(f"Warning: {jsonl_path} is older than the article files; "
+                  f"importing them individually (re-run build_jsonl.py to refresh it)")
+        else:
+            print(f"Using article bundle: {jsonl_path}")
+            with open(jsonl_path, 'rb') as f:
+                for line_number, line in enumerate(f, 1):
+                    if line.strip():
+                        yield f"{ARTICLES_JSONL}:{line_number}", partial(json_loads, line)
+            return
+    
+    if not json_files:
+        print(f"Warning: No JSON files found in {articles_path}")
+    
+    for json_file in json_files:
+        yield json_file.name, partial(load_json_file, json_file)
 
 
 def create_database(db_path):
@@ -47,60 +133,57 @@ def create_database(db_path):
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
+    for pragma in BULK_LOAD_PRAGMAS:
+        cursor.execute(pragma)
+    
+    # Drop existing tables (for clean re-import)
+    cursor.execute("DROP TABLE IF EXISTS help_articles_fts")
+    cursor.execute("DROP TABLE IF EXISTS help_articles")
+    
     # Create help_articles table
     cursor.execute("""
-        CREATE TABLE IF NOT EXISTS help_articles (
+        CREATE TABLE help_articles (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             article_title TEXT NOT NULL,
             breadcrumbs TEXT,
             intended_users TEXT,
             path TEXT,
             article_body TEXT,
-            article_text TEXT,
             filename TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
     
-    # Create indexes for better search performance
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_title ON help_articles(article_title)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_path ON help_articles(path)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_filename ON help_articles(filename)")
-    
-    # Create full-text search virtual table
+    # Create full-text search virtual table. It is contentless: the extracted
+    # plain text is only needed for indexing, so it is written straight into
+    # FTS instead of being stored a second time in help_articles.
     cursor.execute("""
-        CREATE VIRTUAL TABLE IF NOT EXISTS help_articles_fts USING fts5(
+        CREATE VIRTUAL TABLE help_articles_fts USING fts5(
             article_title, article_text, breadcrumbs, intended_users,
-            content='help_articles',
-            content_rowid='id'
+            content=''
         )
     """)
     
-    # Create triggers to keep FTS table in sync
-    cursor.execute("""
-        CREATE TRIGGER IF NOT EXISTS help_articles_ai AFTER INSERT ON help_articles BEGIN
-            INSERT INTO help_articles_fts(rowid, article_title, article_text, breadcrumbs, intended_users)
-            VALUES (new.id, new.article_title, new.article_text, new.breadcrumbs, new.intended_users);
-        END
-    """)
+    conn.commit()
+    return conn
+
+
+def create_indexes(conn):
+    """Create indexes once the bulk load is done"""
+    cursor = conn.cursor()
     
-    cursor.execute("""
-        CREATE TRIGGER IF NOT EXISTS help_articles_ad AFTER DELETE ON help_articles BEGIN
-            DELETE FROM help_articles_fts WHERE rowid = old.id;
-        END
-    """)
+    # Create indexes for better search performance
+    cursor.execute("CREATE INDEX idx_title ON help_articles(article_title)")
+    cursor.execute("CREATE INDEX idx_path ON help_articles(path)")
+    cursor.execute("CREATE INDEX idx_filename ON help_articles(filename)")
     
-    cursor.execute("""
-        CREATE TRIGGER IF NOT EXISTS help_articles_au AFTER UPDATE ON help_articles BEGIN
-            DELETE FROM help_articles_fts WHERE rowid = old.id;
-            INSERT INTO help_articles_fts(rowid, article_title, article_text, breadcrumbs, intended_users)
-            VALUES (new.id, new.article_title, new.article_text, new.breadcrumbs, new.intended_users);
-        END
-    """)
+    # Covering index for the docs view's previous/next article lookups, so
+    # they never touch the table pages holding the article bodies
+    cursor.execute("CREATE INDEX idx_id_title ON help_articles(id, article_title)")
     
+    cursor.execute("ANALYZE")
     conn.commit()
-    return conn
 
 
 def import_json_to_db(articles_dir, db_path):
@@ -110,76 +193,67 @@ def import_json_to_db(articles_dir, db_path):
     conn = create_database(db_path)
     cursor = conn.cursor()
     
-    # Clear existing data
-    cursor.execute("DELETE FROM help_articles")
-    conn.commit()
-    
-    # Find all JSON files
     articles_path = Path(articles_dir)
-    json_files = list(articles_path.glob("*.json"))
-    
-    if not json_files:
-        print(f"Warning: No JSON files found in {articles_dir}")
-        return 0, 0
     
     imported_count = 0
     skipped_count = 0
+    rows = []
+    article_texts = []
     
-    for json_file in sorted(json_files):
+    for name, load_article in iter_article_sources(articles_path):
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_article()
             
             # Extract fields
-            article_title = data.get('article_title', '').strip()
-            breadcrumbs = data.get('breadcrumbs', '').strip()
-            intended_users = data.get('intended_users', [])
-            path = data.get('path', '').strip()
-            article_body = data.get('article_body', '').strip()
+            get = data.get
+            name = get('_filename', name)
+            article_title = get('article_title', '').strip()
+            article_body = get('article_body', '').strip()
             
             # Skip if no title or body
             if not article_title or not article_body:
-                print(f"Skipping {json_file.name}: Missing title or body")
+                print(f"Skipping {name}: Missing title or body")
                 skipped_count += 1
                 continue
             
             # Convert intended_users list to comma-separated string
-            intended_users_str = ', '.join(intended_users) if isinstance(intended_users, list) else str(intended_users)
+            intended_users = get('intended_users') or ()
+            if not isinstance(intended_users, (list, tuple)):
+                intended_users = (str(intended_users),)
             
-            # Extract plain text from HTML for search indexing
-            article_text = extract_text_from_html(article_body)
-            
-            # Insert into database
-            cursor.execute("""
-                INSERT INTO help_articles (
-                    article_title,
-                    breadcrumbs,
-                    intended_users,
-                    path,
-                    article_body,
-                    article_text,
-                    filename
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
+            rows.append((
                 article_title,
-                breadcrumbs,
-                intended_users_str,
-                path,
+                get('breadcrumbs', '').strip(),
+                ', '.join(intended_users),
+                get('path', '').strip(),
                 article_body,
-                article_text,
-                json_file.name
+                name
             ))
             
-            imported_count += 1
+            # Extract plain text from HTML for search indexing
+            article_texts.append(extract_text_from_html(article_body))
             
         except json.JSONDecodeError as e:
-            print(f"Error parsing {json_file.name}: {e}")
+            print(f"Error parsing {name}: {e}")
             skipped_count += 1
         except Exception as e:
-            print(f"Error processing {json_file.name}: {e}")
+            print(f"Error processing {name}: {e}")
             skipped_count += 1
     
-    conn.commit()
+    # Bulk insert in a single transaction, then index the new rows in FTS
+    # (ids are assigned in insertion order on the freshly created table)
+    with conn:
+        cursor.executemany(INSERT_ARTICLE_SQL, rows)
+        cursor.execute("SELECT id FROM help_articles ORDER BY id")
+        ids = [row[0] for row in cursor.fetchall()]
+        cursor.executemany(INSERT_FTS_SQL, (
+            (article_id, row[0], article_text, row[1], row[2])
+            for article_id, row, article_text in zip(ids, rows, article_texts)
+        ))
+    imported_count = len(rows)
+    
+    create_indexes(conn)
+    
     conn.close()
     
     return imported_count, skipped_count
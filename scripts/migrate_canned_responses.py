@@ -12,11 +12,31 @@ from pathlib import Path
 
 import pandas as pd
 
+# pandas knows the calamine engine from 2.2 on
+PANDAS_HAS_CALAMINE = tuple(int(part) for part in pd.__version__.split('.')[:2]) >= (2, 2)
+
+try:
+    import python_calamine  # noqa: F401
+    # Rust XLSX reader, much faster than openpyxl
+    EXCEL_ENGINE = 'calamine' if PANDAS_HAS_CALAMINE else 'openpyxl'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
 # Configuration
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 EXCEL_PATH = DATA_DIR / "Canned_Responses.xlsx"
 DB_PATH = DATA_DIR / "teamsupport.db"
 
+# Speed up the one-shot load. teamsupport.db already exists and is shared with
+# the viewer, so page_size/locking_mode are left alone and the journal is kept
+# in memory rather than disabled.
+BULK_LOAD_PRAGMAS = [
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-262144",
+]
+
 
 def create_table(conn: sqlite3.Connection):
     """Create the canned_responses table."""
@@ -40,47 +60,54 @@ def create_table(conn: sqlite3.Connection):
         )
     """)
     
+    conn.commit()
+    print("✅ Created canned_responses table")
+
+
+def create_indexes(conn: sqlite3.Connection):
+    """Create indexes after the bulk insert so they are built in one pass."""
+    cursor = conn.cursor()
+    
     # Create indexes for faster searching
     cursor.execute("CREATE INDEX idx_cr_ticket_number ON canned_responses(ticket_number)")
     cursor.execute("CREATE INDEX idx_cr_category ON canned_responses(category)")
     cursor.execute("CREATE INDEX idx_cr_parent_category ON canned_responses(parent_category)")
     cursor.execute("CREATE INDEX idx_cr_date_created ON canned_responses(date_created)")
+    cursor.execute("ANALYZE canned_responses")
     
     conn.commit()
-    print("✅ Created canned_responses table with indexes")
+    print("✅ Created canned_responses indexes")
 
 
 def import_data(conn: sqlite3.Connection, df: pd.DataFrame):
     """Import data from DataFrame into database."""
-    cursor = conn.cursor()
-    
-    count = 0
-    for _, row in df.iterrows():
+    # Build the insert frame column-wise instead of boxing every row
+    insert_df = pd.DataFrame({
+        'ticket_id': df['Ticket ID'].astype('Int64'),
+        'ticket_number': df['Ticket Number'].astype('Int64'),
+        'ticket_name': df['Ticket Name'],
         # Convert datetime to ISO format string
-        date_created = None
-        if pd.notna(row['Date Ticket Created']):
-            date_created = row['Date Ticket Created'].strftime('%Y-%m-%d %H:%M:%S')
-        
-        cursor.execute("""
+        'date_created': pd.to_datetime(df['Date Ticket Created']).dt.strftime('%Y-%m-%d %H:%M:%S'),
+        'action_description': df['Action Description'],
+        'action_type': df['Action Type'],
+        'category': df['Knowledge Base Category Name'],
+        'parent_category': df['Knowledge Base Parent Category Name'],
+        'is_knowledgebase': df['Is KnowledgeBase'].fillna(False).astype(bool),
+    })
+    
+    # NaN/NaT -> NULL, numpy scalars -> Python types for sqlite3
+    insert_df = insert_df.astype(object).where(insert_df.notna(), None)
+    rows = list(insert_df.itertuples(index=False, name=None))
+    
+    with conn:
+        conn.executemany("""
             INSERT INTO canned_responses 
             (ticket_id, ticket_number, ticket_name, date_created, action_description, 
              action_type, category, parent_category, is_knowledgebase)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            int(row['Ticket ID']) if pd.notna(row['Ticket ID']) else None,
-            int(row['Ticket Number']) if pd.notna(row['Ticket Number']) else None,
-            row['Ticket Name'] if pd.notna(row['Ticket Name']) else None,
-            date_created,
-            row['Action Description'] if pd.notna(row['Action Description']) else None,
-            row['Action Type'] if pd.notna(row['Action Type']) else None,
-            row['Knowledge Base Category Name'] if pd.notna(row['Knowledge Base Category Name']) else None,
-            row['Knowledge Base Parent Category Name'] if pd.notna(row['Knowledge Base Parent Category Name']) else None,
-            bool(row['Is KnowledgeBase']) if pd.notna(row['Is KnowledgeBase']) else False
-        ))
-        count += 1
+        """, rows)
     
-    conn.commit()
-    print(f"✅ Imported {count} canned responses")
+    print(f"✅ Imported {len(rows)} canned responses")
 
 
 def main():
@@ -99,15 +126,18 @@ def main():
         return False
     
     print(f"📊 Reading {EXCEL_PATH}...")
-    df = pd.read_excel(EXCEL_PATH, engine='openpyxl')
+    df = pd.read_excel(EXCEL_PATH, engine=EXCEL_ENGINE)
     print(f"   Found {len(df)} canned responses")
     
     print(f"\n💾 Connecting to {DB_PATH}...")
     conn = sqlite3.connect(DB_PATH)
+    for pragma in BULK_LOAD_PRAGMAS:
+        conn.execute(pragma)
     
     try:
         create_table(conn)
         import_data(conn, df)
+        create_indexes(conn)
         
         # Verify
         cursor = conn.cursor()
@@ -12,13 +12,28 @@ This script:
 4. Creates indexed SQLite database
 """
 
+import os
 import re
 import sqlite3
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow  # noqa: F401
+    # Multithreaded Arrow CSV parser
+    CSV_READ_KWARGS = {'engine': 'pyarrow'}
+except ImportError:
+    CSV_READ_KWARGS = {'low_memory': False}
+
+# The customer_daily query is shared with the app (src/analytics_sql.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.analytics_sql import customer_daily_sql  # noqa: E402
+
 # === Configuration ===
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
@@ -53,6 +68,84 @@ CSV_PATHS = [
 
 DB_PATH = DATA_DIR / "teamsupport.db"
 
+# Dates are stored in SQLite as ISO strings
+SQLITE_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Rows per worker task when cleaning message bodies in parallel
+CLEAN_CHUNK_SIZE = 50000
+
+# Rows per executemany() batch when inserting messages
+INSERT_CHUNK_SIZE = 50000
+
+# The database is rebuilt from scratch on every run, so durability is traded
+# for load speed. page_size must be set before the first table is created.
+BULK_LOAD_PRAGMAS = [
+    "PRAGMA page_size=32768",
+    "PRAGMA journal_mode=OFF",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-1048576",
+    "PRAGMA mmap_size=30000000000",
+    "PRAGMA locking_mode=EXCLUSIVE",
+]
+
+
+# Daily per-customer ticket facts served to the analytics dashboard, reading
+# the hour columns stored at ingest instead of computing them
+CUSTOMER_DAILY_SQL = customer_daily_sql(stored_hours=True)
+
+
+# === Precompiled Patterns ===
+
+BCC_HEADER_RE = re.compile(
+    r'Ticket created via e-mail \(BCC line\)\. Sender:.*?responding to requests\.\s*',
+    re.IGNORECASE | re.DOTALL
+)
+
+BOILERPLATE_RES = [
+    re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in [
+        r'^(Action added via e-mail|Ticket created via e-mail)\..*\n?',
+        r'These people were on the To line of the email:[^\n]*\n?',
+        r'These people were on the CC line of the email:[^\n]*\n?',
+        r"You don't often get email from[^\n]*\n?",
+        r'Learn why this is important\s*\n?',
+        r'External Sender - Use caution opening files[^\n]*\n?',
+        r'^Hello iLab Support,.*\n',
+    ]
+]
+
+# Literal prefixes of the patterns above. A single combined scan tells us
+# whether any of the removal passes can match at all, so most messages skip
+# them entirely.
+BOILERPLATE_MARKER_RE = re.compile('|'.join(re.escape(marker) for marker in [
+    'Ticket created via e-mail',
+    'Action added via e-mail',
+    'These people were on the',
+    "You don't often get email from",
+    'Learn why this is important',
+    'External Sender - Use caution opening files',
+    'Hello iLab Support,',
+]), re.IGNORECASE)
+
+# Whitespace normalization (normalize_whitespace() and its vectorized form)
+WHITESPACE_CHARS_RE = re.compile('[\t\u00a0]|\u00ac\u2020')
+MULTI_SPACE_RE = re.compile(r' {2,}')
+LEADING_LINE_SPACE_RE = re.compile(r'^[^\S\n]+', re.MULTILINE)
+
+# Canonical portal form headings, located with str.find before falling back
+# to the tolerant PORTAL_SUBMISSION_RE
+PORTAL_ISSUE_HEADING = "Please explain the issue you're experiencing (with as much detail as possible):"
+PORTAL_LOCATION_HEADING = "Location where issue occurred (e.g. link, name of core, etc.):"
+PORTAL_FOOTER = "**Please feel free to record"
+
+PORTAL_SUBMISSION_RE = re.compile(r"""
+    Please\s+explain\s+the\s+issue\s+you(?:'|')re\s+experiencing\s*\(with\s+as\s+much\s+detail\s+as\s+possible\)\s*:\s*
+    (?P<issue>.*?)
+    Location\s+where\s+issue\s+occurred\s*\(e\.g\.?\s*link,\s*name\s+of\s+core,\s*etc\.?\)\s*:\s*
+    (?P<location>.*?)
+    (?:\*{2}Please\s+feel\s+free\s+to\s+record.*)?$
+""", re.DOTALL | re.IGNORECASE | re.VERBOSE)
+
 
 # === Text Cleaning Functions (copied from main.py) ===
 
@@ -62,28 +155,40 @@ def normalize_whitespace(text):
     text = text.replace('\t', ' ')
     text = text.replace('\u00a0', ' ')
     text = text.replace('\u00ac\u2020', ' ')
-    text = re.sub(r' {2,}', ' ', text)
+    text = MULTI_SPACE_RE.sub(' ', text)
     return text.strip()
 
 
+def format_portal_submission(issue: str, location: str, text: str) -> str:
+    output_parts = []
+    if issue:
+        output_parts.append(f"Issue:\n{issue}")
+    if location:
+        output_parts.append(f"Location:\n{location}")
+    return '\n\n'.join(output_parts) if output_parts else text
+
+
 def parse_portal_submission(text: str) -> str:
-    pattern = r"""
-        Please\s+explain\s+the\s+issue\s+you(?:'|')re\s+experiencing\s*\(with\s+as\s+much\s+detail\s+as\s+possible\)\s*:\s*
-        (?P<issue>.*?)
-        Location\s+where\s+issue\s+occurred\s*\(e\.g\.?\s*link,\s*name\s+of\s+core,\s*etc\.?\)\s*:\s*
-        (?P<location>.*?)
-        (?:\*{2}Please\s+feel\s+free\s+to\s+record.*)?$
-    """
-    match = re.search(pattern, text, flags=re.DOTALL | re.IGNORECASE | re.VERBOSE)
+    # Fast path for the canonical form. Only taken when the anchor words occur
+    # once, so the regex could not have matched a different variant first.
+    lowered = text.lower()
+    if lowered.count('explain') == 1 and lowered.count('occurred') == 1:
+        issue_start = text.find(PORTAL_ISSUE_HEADING)
+        location_start = text.find(PORTAL_LOCATION_HEADING, max(issue_start, 0))
+        if issue_start >= 0 and location_start >= 0:
+            issue = text[issue_start + len(PORTAL_ISSUE_HEADING):location_start].strip()
+            location = text[location_start + len(PORTAL_LOCATION_HEADING):]
+            footer_start = location.find(PORTAL_FOOTER)
+            if footer_start == location.lower().find('**please'):
+                if footer_start >= 0:
+                    location = location[:footer_start]
+                return format_portal_submission(issue, location.strip(), text)
+    
+    match = PORTAL_SUBMISSION_RE.search(text)
     if match:
         issue = match.group('issue').strip()
         location = match.group('location').strip()
-        output_parts = []
-        if issue:
-            output_parts.append(f"Issue:\n{issue}")
-        if location:
-            output_parts.append(f"Location:\n{location}")
-        return '\n\n'.join(output_parts) if output_parts else text
+        return format_portal_submission(issue, location, text)
     return text
 
 
@@ -92,21 +197,10 @@ def clean_message_body(text: str) -> str:
         return ""
     text = str(text)
     
-    bcc_header_pattern = r'Ticket created via e-mail \(BCC line\)\. Sender:.*?responding to requests\.\s*'
-    text = re.sub(bcc_header_pattern, '', text, flags=re.IGNORECASE | re.DOTALL)
-    
-    patterns = [
-        r'^(Action added via e-mail|Ticket created via e-mail)\..*\n?',
-        r'These people were on the To line of the email:[^\n]*\n?',
-        r'These people were on the CC line of the email:[^\n]*\n?',
-        r"You don't often get email from[^\n]*\n?",
-        r'Learn why this is important\s*\n?',
-        r'External Sender - Use caution opening files[^\n]*\n?',
-        r'^Hello iLab Support,.*\n',
-    ]
-    
-    for pattern in patterns:
-        text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
+    if BOILERPLATE_MARKER_RE.search(text):
+        text = BCC_HEADER_RE.sub('', text)
+        for pattern in BOILERPLATE_RES:
+            text = pattern.sub('', text)
     
     text = normalize_whitespace(text)
     lines = text.split('\n')
@@ -117,6 +211,27 @@ def clean_message_body(text: str) -> str:
     return text.strip()
 
 
+def clean_message_bodies(texts: pd.Series) -> pd.Series:
+    """Column-wise clean_message_body(): one .str pass per pattern."""
+    s = texts.fillna('').astype(str)
+    
+    has_boilerplate = s.str.contains(BOILERPLATE_MARKER_RE)
+    boilerplate = s[has_boilerplate].str.replace(BCC_HEADER_RE, '', regex=True)
+    for pattern in BOILERPLATE_RES:
+        boilerplate = boilerplate.str.replace(pattern, '', regex=True)
+    s[has_boilerplate] = boilerplate
+    
+    s = s.str.replace(WHITESPACE_CHARS_RE, ' ', regex=True)
+    s = s.str.replace(MULTI_SPACE_RE, ' ', regex=True).str.strip()
+    s = s.str.replace(LEADING_LINE_SPACE_RE, '', regex=True)
+    
+    # Only portal submissions need the expensive structured parse
+    is_portal = s.str.contains('explain', case=False, regex=False)
+    s[is_portal] = s[is_portal].map(parse_portal_submission)
+    
+    return s.str.strip()
+
+
 # === Migration Logic ===
 
 def create_schema(conn: sqlite3.Connection):
@@ -124,6 +239,8 @@ def create_schema(conn: sqlite3.Connection):
     cursor = conn.cursor()
     
     # Drop existing tables
+    cursor.execute("DROP TABLE IF EXISTS customer_daily")
+    cursor.execute("DROP TABLE IF EXISTS tickets_fts")
     cursor.execute("DROP TABLE IF EXISTS messages")
     cursor.execute("DROP TABLE IF EXISTS tickets")
     
@@ -141,7 +258,8 @@ def create_schema(conn: sqlite3.Connection):
             customers TEXT,
             assigned_to TEXT,
             ticket_source TEXT,
-            ticket_owner TEXT
+            ticket_owner TEXT,
+            resolution_hours REAL
         )
     """)
     
@@ -156,6 +274,7 @@ def create_schema(conn: sqlite3.Connection):
             action_description TEXT,
             cleaned_description TEXT,
             role TEXT,
+            response_hours REAL,
             FOREIGN KEY (ticket_number) REFERENCES tickets(ticket_number)
         )
     """)
@@ -171,10 +290,77 @@ def create_indexes(conn: sqlite3.Connection):
     cursor.execute("CREATE INDEX idx_tickets_status ON tickets(status)")
     cursor.execute("CREATE INDEX idx_tickets_date ON tickets(date_action_created DESC)")
     cursor.execute("CREATE INDEX idx_tickets_name ON tickets(ticket_name)")
+    # Analytics: date-range filters, per-customer breakdowns and agent responses
+    cursor.execute("CREATE INDEX idx_tickets_created ON tickets(date_ticket_created)")
+    cursor.execute("CREATE INDEX idx_tickets_customers_created ON tickets(customers, date_ticket_created)")
+    cursor.execute("""
+        CREATE INDEX idx_messages_agent_responses ON messages(ticket_number, response_hours)
+        WHERE role = 'Agent' AND action_type != 'Description'
+    """)
+    # Ticket list facet filters (customers is covered by idx_tickets_customers_created)
+    cursor.execute("CREATE INDEX idx_tickets_assigned ON tickets(assigned_to)")
+    cursor.execute("CREATE INDEX idx_tickets_type ON tickets(ticket_type)")
+    cursor.execute("CREATE INDEX idx_tickets_subcategory ON tickets(subcategory)")
+    cursor.execute("CREATE INDEX idx_tickets_year ON tickets(strftime('%Y', date_action_created))")
+    cursor.execute("CREATE INDEX idx_tickets_month ON tickets(strftime('%m', date_action_created))")
     conn.commit()
     print("✅ Indexes created")
 
 
+def create_search_index(conn: sqlite3.Connection):
+    """Index ticket names for the ticket list's substring search."""
+    cursor = conn.cursor()
+    # Trigram tokens let FTS5 answer LIKE '%term%' from the index
+    cursor.execute("""
+        CREATE VIRTUAL TABLE tickets_fts USING fts5(
+            ticket_name,
+            content='tickets', content_rowid='ticket_number',
+            tokenize='trigram'
+        )
+    """)
+    cursor.execute("INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild')")
+    conn.commit()
+    print("✅ Search index created")
+
+
+def create_analytics_tables(conn: sqlite3.Connection):
+    """Materialize the daily per-customer facts behind the analytics KPIs."""
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS customer_daily")
+    cursor.execute(f"CREATE TABLE customer_daily AS {CUSTOMER_DAILY_SQL}")
+    cursor.execute("CREATE INDEX idx_customer_daily_day ON customer_daily(day, customers)")
+    cursor.execute("CREATE INDEX idx_customer_daily_customers ON customer_daily(customers, day)")
+    conn.commit()
+    print("✅ Analytics tables created")
+
+
+def hours_between(start: pd.Series, end: pd.Series) -> pd.Series:
+    """Elapsed hours between two datetime columns (NaN where either is missing)."""
+    return (end - start).dt.total_seconds() / 3600
+
+
+def insert_messages(conn: sqlite3.Connection, messages_df: pd.DataFrame):
+    """Bulk insert messages with executemany in a single transaction."""
+    # NaN/NaT -> NULL, numpy scalars -> Python types for sqlite3
+    messages_df = messages_df.astype(object).where(messages_df.notna(), None)
+    rows = messages_df.itertuples(index=False, name=None)
+    
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN EXCLUSIVE")
+        while True:
+            chunk = list(islice(rows, INSERT_CHUNK_SIZE))
+            if not chunk:
+                break
+            cursor.executemany("""
+                INSERT INTO messages (
+                    ticket_number, action_creator_name, action_type,
+                    date_action_created, action_description, cleaned_description, role,
+                    response_hours
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, chunk)
+
+
 def migrate():
     """Main migration function."""
     print("=" * 60)
@@ -189,7 +375,7 @@ def migrate():
             print(f"   ⚠️  [{i}/{len(CSV_PATHS)}] MISSING: {path}")
             continue
         print(f"   [{i}/{len(CSV_PATHS)}] Loading {path}...")
-        dfs.append(pd.read_csv(path, low_memory=False))
+        dfs.append(pd.read_csv(path, **CSV_READ_KWARGS))
     
     if not dfs:
         print("❌ No CSV files found! Aborting.")
@@ -203,41 +389,39 @@ def migrate():
     df = df[df['Is Visible on Hub'] == True].copy()
     print(f"   → {len(df):,} visible rows")
     
-    # Step 3: Convert dates to ISO format
+    # Step 3: Parse dates (formatted as ISO strings only when writing to SQLite)
     print("\n📅 Converting dates...")
     for col in ['Date Action Created', 'Date Ticket Created', 'Date Closed']:
         df[col] = pd.to_datetime(df[col], format='%m/%d/%Y %I:%M %p', errors='coerce')
-        # Convert to ISO string for SQLite
-        df[col + '_ISO'] = df[col].dt.strftime('%Y-%m-%d %H:%M:%S')
     
     # Step 4: Clean message bodies
     print("\n🧹 Cleaning message bodies (this may take a few minutes)...")
     total = len(df)
+    texts = df['Action Description']
+    chunks = [texts.iloc[i:i + CLEAN_CHUNK_SIZE] for i in range(0, total, CLEAN_CHUNK_SIZE)]
     cleaned = []
-    for i, text in enumerate(df['Action Description']):
-        if i % 50000 == 0 and i > 0:
-            print(f"   Processed {i:,}/{total:,} ({100*i/total:.0f}%)")
-        cleaned.append(clean_message_body(text))
-    df['Cleaned Description'] = cleaned
+    done = 0
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for chunk in executor.map(clean_message_bodies, chunks):
+            cleaned.append(chunk)
+            done += len(chunk)
+            print(f"   Processed {done:,}/{total:,} ({100*done/total:.0f}%)")
+    df['Cleaned Description'] = pd.concat(cleaned) if cleaned else texts.fillna('')
     print(f"   ✅ Cleaned {total:,} messages")
     
     # Step 5: Determine role
     print("\n👤 Determining roles...")
-    df['Role'] = df.apply(
-        lambda row: 'Agent' if row['Action Creator Name'] == row['Assigned To'] else 'Customer',
-        axis=1
-    )
+    df['Role'] = np.where(df['Action Creator Name'].eq(df['Assigned To']), 'Agent', 'Customer')
     
     # Step 6: Derive ticket owner
     print("\n🎯 Deriving ticket owners...")
-    def get_ticket_owner(group):
-        desc_row = group[group['Action Type'] == 'Description']
-        if not desc_row.empty:
-            return desc_row.iloc[0]['Action Creator Name']
-        return 'Unknown'
-    
-    ticket_owners = df.groupby('Ticket Number').apply(get_ticket_owner, include_groups=False).reset_index()
-    ticket_owners.columns = ['Ticket Number', 'Ticket Owner']
+    # Creator of the first 'Description' action per ticket; tickets without one
+    # fall through to 'Unknown' in the merge below
+    ticket_owners = (
+        df.loc[df['Action Type'].eq('Description'), ['Ticket Number', 'Action Creator Name']]
+        .drop_duplicates('Ticket Number', keep='first')
+        .rename(columns={'Action Creator Name': 'Ticket Owner'})
+    )
     
     # Step 7: Create tickets summary
     print("\n📋 Creating tickets summary...")
@@ -245,9 +429,9 @@ def migrate():
         'Ticket Name': 'first',
         'Status': 'first',
         'Subcategory': 'first',
-        'Date Action Created_ISO': 'max',
-        'Date Ticket Created_ISO': 'first',
-        'Date Closed_ISO': 'first',
+        'Date Action Created': 'max',
+        'Date Ticket Created': 'first',
+        'Date Closed': 'first',
         'Ticket Type': 'first',
         'Customers': 'first',
         'Assigned To': 'first',
@@ -263,18 +447,29 @@ def migrate():
         'date_action_created', 'date_ticket_created', 'date_closed',
         'ticket_type', 'customers', 'assigned_to', 'ticket_source', 'ticket_owner'
     ]
+    # Hours are stored once here so analytics never needs julianday() per row
+    ticket_created = tickets_summary.set_index('ticket_number')['date_ticket_created']
+    tickets_summary['resolution_hours'] = hours_between(
+        tickets_summary['date_ticket_created'], tickets_summary['date_closed']
+    )
+    for col in ['date_action_created', 'date_ticket_created', 'date_closed']:
+        tickets_summary[col] = tickets_summary[col].dt.strftime(SQLITE_DATE_FORMAT)
     
     print(f"   → {len(tickets_summary):,} unique tickets")
     
     # Step 8: Prepare messages for database
     print("\n💾 Preparing messages...")
     messages_df = df[['Ticket Number', 'Action Creator Name', 'Action Type', 
-                      'Date Action Created_ISO', 'Action Description', 
+                      'Date Action Created', 'Action Description', 
                       'Cleaned Description', 'Role']].copy()
     messages_df.columns = [
         'ticket_number', 'action_creator_name', 'action_type',
         'date_action_created', 'action_description', 'cleaned_description', 'role'
     ]
+    messages_df['response_hours'] = hours_between(
+        messages_df['ticket_number'].map(ticket_created), messages_df['date_action_created']
+    )
+    messages_df['date_action_created'] = messages_df['date_action_created'].dt.strftime(SQLITE_DATE_FORMAT)
     
     # Step 9: Write to SQLite
     print(f"\n🗄️  Writing to {DB_PATH}...")
@@ -286,6 +481,8 @@ def migrate():
         print("   Removed existing database")
     
     conn = sqlite3.connect(DB_PATH)
+    for pragma in BULK_LOAD_PRAGMAS:
+        conn.execute(pragma)
     create_schema(conn)
     
     # Insert tickets
@@ -293,10 +490,12 @@ def migrate():
     print(f"   ✅ Inserted {len(tickets_summary):,} tickets")
     
     # Insert messages
-    messages_df.to_sql('messages', conn, if_exists='append', index=False)
+    insert_messages(conn, messages_df)
     print(f"   ✅ Inserted {len(messages_df):,} messages")
     
     create_indexes(conn)
+    create_search_index(conn)
+    create_analytics_tables(conn)
     
     # Optimize database
     conn.execute("VACUUM")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+KB Database Optimization Script
+Adds the indexes the canned responses views use to kb_articles.db and
+compacts its full-text index
+
+Usage: python optimize_kb_db.py [path/to/kb_articles.db]
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Configuration
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+DB_PATH = DATA_DIR / "kb_articles.db"
+
+# The list views default to ORDER BY date_modified DESC LIMIT n, optionally
+# filtered by category; both indexes let SQLite walk rows in display order
+# instead of sorting the whole table
+KB_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_kb_date_modified ON kb_articles(date_modified DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_kb_category_modified ON kb_articles(category_name, date_modified DESC)",
+]
+
+LIST_QUERY_PLANS = {
+    "Latest articles": "SELECT * FROM kb_articles ORDER BY date_modified DESC LIMIT 50",
+    "Latest in category": """
+        SELECT * FROM kb_articles WHERE category_name = 'x'
+        ORDER BY date_modified DESC LIMIT 50
+    """,
+}
+
+
+def optimize(db_path):
+    """Create the list indexes, merge FTS segments and refresh statistics."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    with conn:
+        for ddl in KB_INDEXES:
+            cursor.execute(ddl)
+        print("✅ Indexes created")
+
+        # Merge the FTS index into a single b-tree so MATCH reads one segment
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'kb_articles_fts'")
+        if cursor.fetchone():
+            cursor.execute("INSERT INTO kb_articles_fts(kb_articles_fts) VALUES ('optimize')")
+            print("✅ Full-text index optimized")
+
+    cursor.execute("ANALYZE")
+
+    for name, sql in LIST_QUERY_PLANS.items():
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        plan = '; '.join(row[3] for row in cursor.fetchall())
+        print(f"   {name}: {plan}")
+
+    conn.close()
+
+
+def main():
+    """Main execution function"""
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DB_PATH
+
+    if not db_path.exists():
+        print(f"❌ Database not found: {db_path}")
+        sys.exit(1)
+
+    print(f"🔧 Optimizing {db_path}...")
+    optimize(db_path)
+
+
+if __name__ == "__main__":
+    main()
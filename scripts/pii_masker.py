@@ -14,14 +14,95 @@ Example:
 
 import re
 import csv
+import io
 import json
 import argparse
 import hashlib
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple, Set
 from dataclasses import dataclass, field
 
+try:
+    # C JSON encoder/decoder for large mapping files; output matches
+    # json.dump(indent=2, ensure_ascii=False)
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Optional linear-time engine for the PII scan (PIIMasker(use_re2=True))
+    import re2
+except ImportError:
+    re2 = None
+
+
+# Inline flags that can be scoped to one branch of a combined regex
+SCOPED_FLAGS = (
+    (re.IGNORECASE, 'i'),
+    (re.MULTILINE, 'm'),
+    (re.DOTALL, 's'),
+    (re.VERBOSE, 'x'),
+)
+
+
+def _scoped_pattern(pattern: str, flags: int) -> str:
+    """Wrap a pattern so it keeps its own flags inside an alternation."""
+    on = ''.join(letter for flag, letter in SCOPED_FLAGS if flags & flag)
+    return f"(?{on}:{pattern})" if on else f"(?:{pattern})"
+
+
+def _combine_patterns(patterns, use_re2: bool = False):
+    """
+    Compile patterns into one alternation, scanned once per cell. Each
+    branch is a named group so a match can be traced back to its pattern.
+    """
+    pattern_groups = {f"p{i}": p for i, p in enumerate(patterns)}
+    combined = '|'.join(
+        f"(?P<{group}>{_scoped_pattern(p.pattern, p.flags)})"
+        for group, p in pattern_groups.items()
+    )
+    engine = re2 if use_re2 else re
+    return pattern_groups, engine.compile(combined)
+
+
+# Bytes of blake2b digest in a mask ID, written as 13 base-36 characters
+# (36**13 > 2**64) rather than 16 hex ones. 64 bits keeps a collision
+# (which stops the run) unlikely even with millions of values per category.
+MASK_ID_DIGEST_SIZE = 8
+MASK_ID_WIDTH = 13
+BASE36_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+# Bytes of the random blake2b key drawn for each masking run. Without it a
+# mask ID could be reversed by hashing candidate names, emails or phone numbers.
+MASK_KEY_SIZE = 32
+
+
+def _base36(n: int, width: int) -> str:
+    """Encode a non-negative int in base 36, zero-padded to width."""
+    digits = []
+    while n:
+        n, remainder = divmod(n, 36)
+        digits.append(BASE36_DIGITS[remainder])
+    return ''.join(reversed(digits)).rjust(width, '0')
+
+
+def _raise_mask_id_collision(mask_id: str):
+    """Two distinct values hashed to one mask ID; unmasking could not tell them apart."""
+    raise ValueError(
+        f"Mask ID collision on {mask_id}; re-run to mask with a new key"
+    )
+
+# Distinct cells remembered by mask_text before the cache is dropped
+CELL_CACHE_SIZE = 100_000
+
+# Rows handed to a worker process at a time by mask_csv(workers=N)
+PARALLEL_BATCH_ROWS = 1000
+
 
 @dataclass
 class PIIPattern:
@@ -50,7 +131,10 @@ class PIIMasker:
     PII_PATTERNS: List[PIIPattern] = [
         PIIPattern(
             name="email",
-            pattern=r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+            # Local part capped at the RFC 5321 limit of 64 characters so a
+            # long run of dots/digits without an '@' is not rescanned from
+            # every starting position
+            pattern=r'\b[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
             mask_prefix="EMAIL_MASKED",
             description="Email addresses"
         ),
@@ -89,9 +173,10 @@ class PIIMasker:
         ),
         PIIPattern(
             name="uuid",
-            pattern=r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b',
+            pattern=r'\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b',
             mask_prefix="UUID_MASKED",
-            description="UUIDs/GUIDs (MOI, etc.)"
+            description="UUIDs/GUIDs (MOI, etc.)",
+            flags=0
         ),
         PIIPattern(
             name="student_id",
@@ -116,6 +201,16 @@ class PIIMasker:
         r'\bRegards,?\s+([A-Z][a-z]+)',
     ]
     
+    # All greetings in one pass; the name is whichever group matched
+    GREETING_REGEX = re.compile('|'.join(GREETING_PATTERNS))
+    
+    # Every built-in pattern needs a digit, '@' or '-' (uuid), so cells
+    # without any of them can skip the PII scan
+    PII_CANDIDATE_REGEX = re.compile(r'[\d@-]')
+    
+    # (pattern_groups, regex) for PII_PATTERNS per engine, built on first use
+    _default_combined: Dict[bool, tuple] = {}
+    
     # Known system/staff emails to preserve or mark differently
     SYSTEM_EMAIL_DOMAINS = [
         'agilent.com',
@@ -125,7 +220,9 @@ class PIIMasker:
     def __init__(self, 
                  mask_staff_emails: bool = False,
                  mask_names_in_greetings: bool = True,
-                 custom_patterns: List[PIIPattern] = None):
+                 custom_patterns: List[PIIPattern] = None,
+                 use_re2: bool = False,
+                 mask_key: bytes = None):
         """
         Initialize the PII Masker.
         
@@ -133,23 +230,55 @@ class PIIMasker:
             mask_staff_emails: Whether to mask internal/staff emails
             mask_names_in_greetings: Whether to mask names in greetings like "Hi John"
             custom_patterns: Additional custom patterns to detect
+            use_re2: Scan with RE2 (google-re2) for linear-time matching on
+                untrusted input. Its \d and \b are ASCII-only, and through the
+                Python binding it is slower than re on typical exports.
+            mask_key: Secret key for mask ID hashes (default: a fresh random
+                key for each mask_csv run)
         """
+        if use_re2 and re2 is None:
+            raise ImportError("use_re2 requires the google-re2 package")
+        
         self.mask_staff_emails = mask_staff_emails
         self.mask_names_in_greetings = mask_names_in_greetings
+        self.custom_patterns = list(custom_patterns or [])
+        self.use_re2 = use_re2
+        # A caller-supplied key is kept for every run; otherwise each run
+        # draws its own
+        self._fixed_mask_key = mask_key
+        self.mask_key = mask_key or os.urandom(MASK_KEY_SIZE)
+        # Matches the domain itself or any subdomain of it
+        self._system_email_suffixes = tuple(
+            prefix + domain.lower()
+            for domain in self.SYSTEM_EMAIL_DOMAINS
+            for prefix in ('@', '.')
+        )
         self.patterns = self.PII_PATTERNS.copy()
         if custom_patterns:
             self.patterns.extend(custom_patterns)
         
+        # The built-in pattern set is compiled once and shared by instances
+        if custom_patterns:
+            self._pattern_groups, self._regex = _combine_patterns(self.patterns, use_re2)
+            # Custom patterns may match anything, so never prefilter
+            self._candidate_regex = None
+        else:
+            self._candidate_regex = self.PII_CANDIDATE_REGEX
+            if use_re2 not in PIIMasker._default_combined:
+                PIIMasker._default_combined[use_re2] = _combine_patterns(self.patterns, use_re2)
+            self._pattern_groups, self._regex = PIIMasker._default_combined[use_re2]
+        
         # Tracking
         self.mappings: Dict[str, Dict[str, str]] = {}
-        self.counters: Dict[str, int] = {}
         self.seen_values: Dict[str, str] = {}  # For consistent masking
+        self._cell_cache: Dict[str, str] = {}  # Masked text per input cell
         
     def reset(self):
-        """Reset all tracking state."""
+        """Reset all tracking state and, unless one was supplied, draw a new mask key."""
+        self.mask_key = self._fixed_mask_key or os.urandom(MASK_KEY_SIZE)
         self.mappings = {}
-        self.counters = {}
         self.seen_values = {}
+        self._cell_cache = {}
         
     def _get_mask_id(self, category: str, value: str) -> str:
         """
@@ -163,24 +292,62 @@ class PIIMasker:
         if key in self.seen_values:
             return self.seen_values[key]
         
-        # Create new mask ID
-        if category not in self.counters:
-            self.counters[category] = 0
-        self.counters[category] += 1
-        
-        mask_id = f"[{category}_{self.counters[category]}]"
-        self.seen_values[key] = mask_id
+        # Within a run the ID is a pure function of (category, value), so it
+        # does not depend on what else was masked or in which order. The hash
+        # is keyed, so IDs differ between runs and can't be reversed without
+        # the mapping file.
+        digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=MASK_ID_DIGEST_SIZE,
+                                 key=self.mask_key).digest()
+        mask_id = f"[{category}_{_base36(int.from_bytes(digest, 'big'), MASK_ID_WIDTH)}]"
         
         # Store mapping
-        if category not in self.mappings:
-            self.mappings[category] = {}
-        self.mappings[category][mask_id.strip('[]')] = value
+        items = self.mappings.setdefault(category, {})
+        existing = items.get(mask_id[1:-1])
+        if existing is not None and existing.lower().strip() != normalized:
+            _raise_mask_id_collision(mask_id)
+        items[mask_id[1:-1]] = value
+        self.seen_values[key] = mask_id
         
         return mask_id
     
     def _is_system_email(self, email: str) -> bool:
         """Check if email belongs to a system/staff domain."""
-        return any(domain in email.lower() for domain in self.SYSTEM_EMAIL_DOMAINS)
+        return email.lower().endswith(self._system_email_suffixes)
+    
+    def _mask_pii_match(self, match: re.Match) -> str:
+        """
+        re.sub callback for the combined PII regex: the mask ID for the
+        match, or the match itself for exempt system emails.
+        """
+        pii_pattern = self._pattern_groups[match.lastgroup]
+        original_value = match.group(0)
+        
+        # Special handling for emails
+        if pii_pattern.name == "email":
+            if self._is_system_email(original_value):
+                if not self.mask_staff_emails:
+                    return original_value
+                category = "EMAIL_SYSTEM_MASKED"
+            else:
+                category = pii_pattern.mask_prefix
+        else:
+            category = pii_pattern.mask_prefix
+        
+        return self._get_mask_id(category, original_value)
+    
+    def _mask_greeting_match(self, match: re.Match) -> str:
+        """re.sub callback for greetings: masks only the captured name."""
+        name_group = match.lastindex
+        name = match.group(name_group)
+        # The name group is [A-Z][a-z]+, so it can never be (part of) a
+        # bracketed mask ID; only very short names are skipped
+        if len(name) <= 2:
+            return match.group(0)
+        start = match.start()
+        full_match = match.group(0)
+        return (full_match[:match.start(name_group) - start]
+                + self._get_mask_id("NAME_MASKED", name)
+                + full_match[match.end(name_group) - start:])
     
     def mask_text(self, text: str) -> str:
         """
@@ -194,53 +361,102 @@ class PIIMasker:
         """
         if not text or not isinstance(text, str):
             return text
-            
-        masked = text
         
-        # Apply each pattern
-        for pii_pattern in self.patterns:
-            regex = re.compile(pii_pattern.pattern, pii_pattern.flags)
+        # Exports repeat cells heavily; mask IDs are a pure function of the
+        # value and the mapping was recorded the first time, so reuse it
+        cached = self._cell_cache.get(text)
+        if cached is not None:
+            return cached
             
-            # Find all matches first to avoid issues with overlapping replacements
-            matches = list(regex.finditer(masked))
-            
-            # Replace from end to start to preserve positions
-            for match in reversed(matches):
-                original_value = match.group(0)
-                
-                # Special handling for emails
-                if pii_pattern.name == "email":
-                    if self._is_system_email(original_value):
-                        if not self.mask_staff_emails:
-                            continue
-                        category = "EMAIL_SYSTEM_MASKED"
-                    else:
-                        category = pii_pattern.mask_prefix
-                else:
-                    category = pii_pattern.mask_prefix
-                
-                mask_id = self._get_mask_id(category, original_value)
-                masked = masked[:match.start()] + mask_id + masked[match.end():]
+        if self._candidate_regex is None or self._candidate_regex.search(text):
+            # Single left-to-right scan; at any position the earliest listed
+            # pattern wins
+            masked = self._regex.sub(self._mask_pii_match, text)
+        else:
+            masked = text
         
         # Mask names in greetings
         if self.mask_names_in_greetings:
-            for greeting_pattern in self.GREETING_PATTERNS:
-                regex = re.compile(greeting_pattern)
-                matches = list(regex.finditer(masked))
-                for match in reversed(matches):
-                    if match.group(1):
-                        name = match.group(1)
-                        # Don't mask if it looks like a masked value already
-                        if not name.startswith('[') and len(name) > 2:
-                            mask_id = self._get_mask_id("NAME_MASKED", name)
-                            full_match = match.group(0)
-                            replacement = full_match.replace(name, mask_id)
-                            masked = masked[:match.start()] + replacement + masked[match.end():]
+            masked = self.GREETING_REGEX.sub(self._mask_greeting_match, masked)
+        
+        if len(self._cell_cache) >= CELL_CACHE_SIZE:
+            self._cell_cache.clear()
+        self._cell_cache[text] = masked
         
         return masked
     
+    def _merge_mappings(self, mappings: Dict[str, Dict[str, str]]):
+        """Fold a worker's mappings in, keeping the first value seen per ID."""
+        for category, items in mappings.items():
+            merged = self.mappings.setdefault(category, {})
+            for mask_id, value in items.items():
+                existing = merged.get(mask_id)
+                if existing is None:
+                    merged[mask_id] = value
+                    self.seen_values[f"{category}:{value.lower().strip()}"] = f"[{mask_id}]"
+                elif existing.lower().strip() != value.lower().strip():
+                    _raise_mask_id_collision(f"[{mask_id}]")
+    
+    def _mask_rows_parallel(self, rows, workers: int):
+        """
+        Yield masked rows in input order, masking batches in worker
+        processes. Mappings are merged in batch order, so the output and
+        mapping match a serial run.
+        """
+        batches = iter(lambda: list(islice(rows, PARALLEL_BATCH_ROWS)), [])
+        initargs = (self.mask_staff_emails, self.mask_names_in_greetings,
+                    self.custom_patterns, self.use_re2, self.mask_key)
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_mask_worker,
+                                 initargs=initargs) as executor:
+            # Keep a bounded number of batches in flight so memory stays flat
+            pending = deque()
+            for batch in batches:
+                pending.append(executor.submit(_mask_rows, batch))
+                if len(pending) >= workers * 2:
+                    masked_rows, mappings = pending.popleft().result()
+                    self._merge_mappings(mappings)
+                    yield from masked_rows
+            while pending:
+                masked_rows, mappings = pending.popleft().result()
+                self._merge_mappings(mappings)
+                yield from masked_rows
+    
+    def _write_masked_csv(self, input_path: Path, output_path: Path, workers: int = None) -> int:
+        """Mask rows as they are read and write them straight out; returns the row count."""
+        rows_processed = 0
+        
+        with open(input_path, 'rb') as fb, \
+                open(output_path, 'w', encoding='utf-8', newline='') as fout:
+            # Detect delimiter from the buffered head of the file, with the
+            # same newline translation the reader applies. peek() doesn't
+            # advance, so parsing starts from the same buffer without a seek.
+            sample = fb.peek(4096)[:4096].decode('utf-8', errors='replace')
+            sample = sample.replace('\r\n', '\n').replace('\r', '\n')
+            fin = io.TextIOWrapper(fb, encoding='utf-8', errors='replace')
+            
+            try:
+                dialect = csv.Sniffer().sniff(sample)
+            except csv.Error:
+                dialect = csv.excel
+            
+            reader = csv.reader(fin, dialect)
+            writer = csv.writer(fout)
+            
+            if workers and workers > 1:
+                masked_rows = self._mask_rows_parallel(reader, workers)
+            else:
+                mask_text = self.mask_text
+                masked_rows = ([mask_text(cell) for cell in row] for row in reader)
+            
+            for masked_row in masked_rows:
+                writer.writerow(masked_row)
+                rows_processed += 1
+        
+        return rows_processed
+    
     def mask_csv(self, input_path: str, output_path: str = None, 
-                 mapping_path: str = None) -> MaskingResult:
+                 mapping_path: str = None, workers: int = None) -> MaskingResult:
         """
         Mask PII in a CSV file.
         
@@ -248,6 +464,7 @@ class PIIMasker:
             input_path: Path to input CSV file
             output_path: Path for masked output (default: input_masked.csv)
             mapping_path: Path for mapping JSON (default: pii_mapping_<filename>.json)
+            workers: Number of processes to scan rows with (default: serial)
             
         Returns:
             MaskingResult with masked file info and statistics
@@ -263,34 +480,14 @@ class PIIMasker:
         output_path = Path(output_path)
         mapping_path = Path(mapping_path)
         
-        # Read and process CSV
-        rows_processed = 0
-        masked_rows = []
-        
-        with open(input_path, 'r', encoding='utf-8', errors='replace') as f:
-            # Detect delimiter
-            sample = f.read(4096)
-            f.seek(0)
-            
-            try:
-                dialect = csv.Sniffer().sniff(sample)
-            except csv.Error:
-                dialect = csv.excel
-            
-            reader = csv.reader(f, dialect)
-            
-            for row in reader:
-                masked_row = []
-                for cell in row:
-                    masked_cell = self.mask_text(cell)
-                    masked_row.append(masked_cell)
-                masked_rows.append(masked_row)
-                rows_processed += 1
-        
-        # Write masked output
-        with open(output_path, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerows(masked_rows)
+        # Write to a side file and move it into place once the mapping is
+        # saved, so a failed run never leaves a masked export without one
+        partial_path = output_path.with_name(f"{output_path.name}.part")
+        try:
+            rows_processed = self._write_masked_csv(input_path, partial_path, workers)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
         
         # Calculate statistics
         stats = {
@@ -307,13 +504,19 @@ class PIIMasker:
                 "masked_file": str(output_path.name),
                 "created_at": datetime.now().isoformat(),
                 "description": "PII mapping for reversibility - CONFIDENTIAL",
+                "mask_key": self.mask_key.hex(),
                 "statistics": stats
             },
             **self.mappings
         }
         
-        with open(mapping_path, 'w', encoding='utf-8') as f:
-            json.dump(mapping_data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            mapping_path.write_bytes(orjson.dumps(mapping_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(mapping_path, 'w', encoding='utf-8') as f:
+                json.dump(mapping_data, f, indent=2, ensure_ascii=False)
+        
+        os.replace(partial_path, output_path)
         
         print(f"\n{'='*60}")
         print(f"PII Masking Complete")
@@ -335,6 +538,38 @@ class PIIMasker:
         )
 
 
+
+_worker_masker = None
+
+
+def _init_mask_worker(mask_staff_emails: bool, mask_names_in_greetings: bool,
+                      custom_patterns: List[PIIPattern], use_re2: bool, mask_key: bytes):
+    """Build the per-process masker used by _mask_rows."""
+    global _worker_masker
+    _worker_masker = PIIMasker(
+        mask_staff_emails=mask_staff_emails,
+        mask_names_in_greetings=mask_names_in_greetings,
+        custom_patterns=custom_patterns,
+        use_re2=use_re2,
+        mask_key=mask_key
+    )
+
+
+def _mask_rows(rows: List[List[str]]) -> Tuple[List[List[str]], Dict[str, Dict[str, str]]]:
+    """Mask a batch of rows in a worker; returns the rows and their mappings."""
+    # Only report mappings first seen in this batch. Anything this worker saw
+    # in an earlier batch was already merged, since batches merge in order,
+    # so its cells and mask IDs stay cached.
+    _worker_masker.mappings = {}
+    mask_text = _worker_masker.mask_text
+    masked_rows = [[mask_text(cell) for cell in row] for row in rows]
+    return masked_rows, _worker_masker.mappings
+
+
+# Shape of a mask ID as written by PIIMasker, e.g. [EMAIL_MASKED_22emz5ok0vzdv]
+MASK_TOKEN_REGEX = re.compile(r'\[[^\[\]]+\]')
+
+
 class PIIUnmasker:
     """
     Reverses PII masking using a mapping file.
@@ -347,8 +582,11 @@ class PIIUnmasker:
         Args:
             mapping_path: Path to the JSON mapping file
         """
-        with open(mapping_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if orjson is not None:
+            data = orjson.loads(Path(mapping_path).read_bytes())
+        else:
+            with open(mapping_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         
         # Extract mappings (skip metadata)
         self.mappings = {k: v for k, v in data.items() if k != "metadata"}
@@ -359,6 +597,22 @@ class PIIUnmasker:
         for category, items in self.mappings.items():
             for mask_id, original in items.items():
                 self.reverse_map[f"[{mask_id}]"] = original
+        
+        # Mask IDs are bracketed tokens, so one generic scan plus a dict
+        # lookup finds them all. Fall back to an explicit alternation
+        # (longest first) if a mapping has IDs that don't fit that shape.
+        if all(MASK_TOKEN_REGEX.fullmatch(mask_id) for mask_id in self.reverse_map):
+            self._regex = MASK_TOKEN_REGEX
+        else:
+            self._regex = re.compile('|'.join(
+                re.escape(mask_id)
+                for mask_id in sorted(self.reverse_map, key=len, reverse=True)
+            ))
+    
+    def _restore(self, match: re.Match) -> str:
+        """Original value for a matched mask ID, or the match if unknown."""
+        mask_id = match.group(0)
+        return self.reverse_map.get(mask_id, mask_id)
     
     def unmask_text(self, text: str) -> str:
         """
@@ -370,13 +624,10 @@ class PIIUnmasker:
         Returns:
             Text with original values restored
         """
-        if not text:
+        if not text or '[' not in text:
             return text
-            
-        result = text
-        for mask_id, original in self.reverse_map.items():
-            result = result.replace(mask_id, original)
-        return result
+        
+        return self._regex.sub(self._restore, text)
     
     def unmask_csv(self, masked_path: str, output_path: str = None) -> str:
         """
@@ -394,13 +645,12 @@ class PIIUnmasker:
             output_path = masked_path.parent / f"{masked_path.stem}_unmasked{masked_path.suffix}"
         output_path = Path(output_path)
         
-        with open(masked_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            rows = [[self.unmask_text(cell) for cell in row] for row in reader]
-        
-        with open(output_path, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerows(rows)
+        with open(masked_path, 'r', encoding='utf-8') as fin, \
+                open(output_path, 'w', encoding='utf-8', newline='') as fout:
+            writer = csv.writer(fout)
+            unmask_text = self.unmask_text
+            for row in csv.reader(fin):
+                writer.writerow([unmask_text(cell) for cell in row])
         
         print(f"Unmasked file saved to: {output_path}")
         return str(output_path)
@@ -435,9 +685,16 @@ Examples:
                         help="Also mask internal/staff email addresses")
     parser.add_argument("--no-mask-names", action="store_true",
                         help="Don't mask names in greetings")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count(),
+                        help="Processes to scan rows with (default: CPU count, 1 = serial)")
+    parser.add_argument("--re2", action="store_true",
+                        help="Use the RE2 engine (google-re2) for linear-time matching")
     
     args = parser.parse_args()
     
+    if args.re2 and re2 is None:
+        parser.error("--re2 requires the google-re2 package")
+    
     if args.unmask:
         if not args.mapping:
             parser.error("--unmask requires --mapping to specify the mapping file")
@@ -446,9 +703,10 @@ Examples:
     else:
         masker = PIIMasker(
             mask_staff_emails=args.mask_staff_emails,
-            mask_names_in_greetings=not args.no_mask_names
+            mask_names_in_greetings=not args.no_mask_names,
+            use_re2=args.re2
         )
-        masker.mask_csv(args.input, args.output, args.mapping)
+        masker.mask_csv(args.input, args.output, args.mapping, workers=args.workers)
 
 
 if __name__ == "__main__":
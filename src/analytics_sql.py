@@ -0,0 +1,72 @@
+"""
+Analytics SQL
+Queries shared by the analytics dashboard and migrate_to_sqlite.py, which
+materializes their results. Kept free of Flask so the script can import it.
+"""
+
+# Global filters to exclude unmapped/internal data
+GLOBAL_FILTER_SQL = """
+    LOWER(customers) NOT LIKE '%unknown company%'
+    AND customers != 'Agilent Technologies (688244)'
+    AND customers IS NOT NULL
+    AND customers != ''
+"""
+
+# Hours from ticket creation to close, and to each agent response: read from
+# the columns stored at ingest, or computed for databases that predate them
+STORED_HOURS = ("resolution_hours", "m.response_hours")
+COMPUTED_HOURS = (
+    "(julianday(date_closed) - julianday(date_ticket_created)) * 24",
+    "(julianday(m.date_action_created) - julianday(f.date_ticket_created)) * 24",
+)
+
+
+def customer_daily_sql(stored_hours=True):
+    """Daily per-customer ticket facts, materialized as the customer_daily table.
+
+    Sums and counts are returned instead of averages so any date range can be
+    re-aggregated.
+    """
+    resolution_hours, response_hours = STORED_HOURS if stored_hours else COMPUTED_HOURS
+    return f"""
+    WITH filtered AS (
+        SELECT ticket_number, customers, status, date_ticket_created, date_closed,
+               date(date_ticket_created) AS day,
+               {resolution_hours} AS resolution_hours
+        FROM tickets
+        WHERE {GLOBAL_FILTER_SQL}
+    ),
+    ticket_days AS (
+        SELECT
+            customers,
+            day,
+            COUNT(*) AS ticket_count,
+            SUM(CASE WHEN LOWER(status) = 'reopened' THEN 1 ELSE 0 END) AS reopened_count,
+            MAX(date_ticket_created) AS last_ticket,
+            COUNT(CASE WHEN date_closed IS NOT NULL THEN resolution_hours END) AS closed_count,
+            SUM(CASE WHEN date_closed IS NOT NULL THEN resolution_hours END) AS closed_hours_sum,
+            COUNT(CASE WHEN date_closed IS NOT NULL AND status IN ('Closed', 'Resolved')
+                       THEN resolution_hours END) AS resolved_count,
+            SUM(CASE WHEN date_closed IS NOT NULL AND status IN ('Closed', 'Resolved')
+                     THEN resolution_hours END) AS resolved_hours_sum
+        FROM filtered
+        GROUP BY customers, day
+    ),
+    response_days AS (
+        SELECT
+            f.customers,
+            f.day,
+            COUNT({response_hours}) AS response_count,
+            SUM({response_hours}) AS response_hours_sum
+        FROM filtered f
+        JOIN messages m ON f.ticket_number = m.ticket_number
+        WHERE m.role = 'Agent' AND m.action_type != 'Description'
+        GROUP BY f.customers, f.day
+    )
+    SELECT
+        td.*,
+        COALESCE(rd.response_count, 0) AS response_count,
+        rd.response_hours_sum
+    FROM ticket_days td
+    LEFT JOIN response_days rd ON rd.customers = td.customers AND rd.day IS td.day
+"""
@@ -0,0 +1,90 @@
+"""
+Response Cache
+Small in-process TTL/LRU cache for read-only JSON API responses
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, make_response, request
+
+from ..db import get_db_path
+
+DEFAULT_MAXSIZE = 512
+DEFAULT_TTL = 60
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_response_cache = TTLCache()
+_db_version = None
+
+
+def clear_cache():
+    """Drop every cached response."""
+    _response_cache.clear()
+
+
+def _check_db_version():
+    """Clear the cache when the database file has been rebuilt."""
+    global _db_version
+    try:
+        version = get_db_path().stat().st_mtime_ns
+    except OSError:
+        version = None
+    if version != _db_version:
+        _db_version = version
+        clear_cache()
+
+
+def cached_json(ttl=DEFAULT_TTL):
+    """Cache successful JSON responses keyed on the endpoint and query string."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            _check_db_version()
+            key = (request.endpoint, tuple(sorted(request.args.items(multi=True))))
+            body = _response_cache.get(key)
+            if body is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                _response_cache.set(key, body, ttl)
+            return Response(body, mimetype='application/json')
+        return wrapper
+    return decorator
@@ -0,0 +1,33 @@
+"""
+JSON Responses
+Serialize API payloads with orjson when it is installed
+"""
+
+import json
+
+from flask import Response, jsonify
+
+try:
+    # Rust JSON encoder, several times faster than the stdlib on float-heavy payloads
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_response(data):
+    """Drop-in for jsonify() that encodes with orjson when available."""
+    if orjson is None:
+        return jsonify(data)
+    return Response(orjson.dumps(data), mimetype='application/json')
+
+
+def encode_json(data):
+    """Serialize data to JSON bytes, with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def raw_json_response(body):
+    """Wrap an already-encoded JSON document (str or bytes) in a response."""
+    return Response(body, mimetype='application/json')
@@ -1,33 +1,80 @@
-from flask import Blueprint, render_template, jsonify, request, g
+from flask import Blueprint, render_template, request, g
 import sqlite3
 from datetime import datetime
 from ..logger import log_info, log_error, log_warning
-from ..db import get_db
+from concurrent.futures import ThreadPoolExecutor
+from ..analytics_sql import GLOBAL_FILTER_SQL, customer_daily_sql
+from ..db import get_db, pooled_db
+from ._cache import cached_json
+from ._json import json_response, raw_json_response
 
 bp = Blueprint('analytics', __name__, url_prefix='/analytics')
 
-# Global filters to exclude unmapped/internal data
-GLOBAL_FILTER_SQL = """
-    LOWER(customers) NOT LIKE '%unknown company%' 
-    AND customers != 'Agilent Technologies (688244)'
-    AND customers IS NOT NULL 
-    AND customers != ''
-"""
+# Hours are computed inline for the temp-view fallback, as databases that
+# lack customer_daily also lack the stored hour columns
+CUSTOMER_DAILY_SQL = customer_daily_sql(stored_hours=False)
 
-def get_date_filter(range_str):
-    """Return SQL for date filtering based on range string."""
-    if not range_str or range_str == 'all':
-        return "1=1"
-    
-    ranges = {
-        '7d': "date_ticket_created >= date('now', '-7 days')",
-        '30d': "date_ticket_created >= date('now', '-30 days')",
-        '90d': "date_ticket_created >= date('now', '-90 days')",
-        '12m': "date_ticket_created >= date('now', '-1 year')",
-        '2y': "date_ticket_created >= date('now', '-2 years')",
-        '5y': "date_ticket_created >= date('now', '-5 years')"
-    }
-    return ranges.get(range_str, "1=1")
+# Runs independent queries of one request side by side, each on its own
+# pooled connection (read-only connections never block each other)
+query_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='analytics')
+
+def prepare_analytics_db(db):
+    """Make customer_daily available on a connection.
+
+    Databases migrated before the table existed get an equivalent temp view,
+    which is slower but returns the same numbers. Returns whether the table
+    exists.
+    """
+    has_table = db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'customer_daily'"
+    ).fetchone() is not None
+    if not has_table:
+        db.execute(f"CREATE TEMP VIEW IF NOT EXISTS customer_daily AS {CUSTOMER_DAILY_SQL}")
+    return has_table
+
+def get_analytics_db():
+    """Get the request connection with customer_daily available."""
+    db = get_db()
+    if 'has_customer_daily' not in g:
+        g.has_customer_daily = prepare_analytics_db(db)
+        if not g.has_customer_daily:
+            log_warning("customer_daily table missing, re-run migrate_to_sqlite.py; using a view")
+    return db
+
+def fetch_analytics(query, params=()):
+    """Run one customer_daily query on a separately pooled connection."""
+    with pooled_db() as db:
+        prepare_analytics_db(db)
+        return db.execute(query, params).fetchall()
+
+def json_array_sql(query, **fields):
+    """Wrap a query so SQLite returns its rows as one JSON array of objects.
+
+    fields maps output keys to column expressions of the query; rows keep
+    the query's ORDER BY.
+    """
+    pairs = ', '.join(f"'{key}', {expr}" for key, expr in fields.items())
+    return f"SELECT json_group_array(json_object({pairs})) FROM ({query})"
+
+# date() modifiers for each dashboard range
+DATE_RANGES = {
+    '7d': "-7 days",
+    '30d': "-30 days",
+    '90d': "-90 days",
+    '12m': "-1 year",
+    '2y': "-2 years",
+    '5y': "-5 years"
+}
+
+# Rendered once per filterable column: tickets.date_ticket_created and customer_daily.day
+DATE_FILTERS = {
+    column: {range_str: f"{column} >= date('now', '{offset}')" for range_str, offset in DATE_RANGES.items()}
+    for column in ('date_ticket_created', 'day')
+}
+
+def get_date_filter(range_str, column='date_ticket_created'):
+    """Return SQL for date filtering based on range string ('all'/unknown -> no filter)."""
+    return DATE_FILTERS[column].get(range_str, "1=1")
 
 @bp.route('/dashboard')
 def dashboard():
@@ -35,54 +82,32 @@ def dashboard():
     return render_template('analytics/dashboard.html')
 
 @bp.route('/api/summary')
+@cached_json()
 def api_summary():
     """High-level KPI summary for the dashboard."""
-    db = get_db()
-    date_filter = get_date_filter(request.args.get('range'))
+    db = get_analytics_db()
+    date_filter = get_date_filter(request.args.get('range'), 'day')
     try:
         cursor = db.cursor()
         
-        # 1. Total Unique Customers (Filtered by date)
-        cursor.execute(f"SELECT COUNT(DISTINCT customers) FROM tickets WHERE {GLOBAL_FILTER_SQL} AND {date_filter}")
-        total_customers = cursor.fetchone()[0]
-        
-        # 2. Active Customers (Last 30 Days - Fixed period, but respect global filters)
-        cursor.execute(f"""
-            SELECT COUNT(DISTINCT customers) 
-            FROM tickets 
-            WHERE {GLOBAL_FILTER_SQL} 
-            AND date_ticket_created >= date('now', '-30 days')
-        """)
-        active_customers = cursor.fetchone()[0]
-        
-        # 3. Overall Avg Response Time (Respect range)
+        # Range totals and the fixed 30-day active count in a single scan;
+        # the range condition lives in CASE so it doesn't drop active rows
         cursor.execute(f"""
-            SELECT AVG(
-                CAST((julianday(m.date_action_created) - julianday(t.date_ticket_created)) * 24 AS REAL)
-            )
-            FROM tickets t
-            JOIN messages m ON t.ticket_number = m.ticket_number
-            WHERE {GLOBAL_FILTER_SQL.replace('customers', 't.customers')} AND {date_filter.replace('date_ticket_created', 't.date_ticket_created')}
-            AND m.role = 'Agent' AND m.action_type != 'Description'
-        """)
-        avg_response = cursor.fetchone()[0] or 0
-        
-        # 4. Overall Avg Resolution Time (Respect range)
-        cursor.execute(f"""
-            SELECT AVG(
-                CAST((julianday(date_closed) - julianday(date_ticket_created)) * 24 AS REAL)
-            )
-            FROM tickets
-            WHERE date_closed IS NOT NULL AND status IN ('Closed', 'Resolved')
-            AND {GLOBAL_FILTER_SQL} AND {date_filter}
+            SELECT
+                COUNT(DISTINCT CASE WHEN {date_filter} THEN customers END),
+                COUNT(DISTINCT CASE WHEN day >= date('now', '-30 days') THEN customers END),
+                SUM(CASE WHEN {date_filter} THEN response_hours_sum END)
+                    / SUM(CASE WHEN {date_filter} THEN response_count END),
+                SUM(CASE WHEN {date_filter} THEN resolved_hours_sum END)
+                    / SUM(CASE WHEN {date_filter} THEN resolved_count END),
+                COALESCE(SUM(CASE WHEN {date_filter} THEN ticket_count END), 0)
+            FROM customer_daily
         """)
-        avg_resolution = cursor.fetchone()[0] or 0
+        total_customers, active_customers, avg_response, avg_resolution, total_tickets = cursor.fetchone()
+        avg_response = avg_response or 0
+        avg_resolution = avg_resolution or 0
 
-        # 5. Total Tickets (Respect range)
-        cursor.execute(f"SELECT COUNT(*) FROM tickets WHERE {GLOBAL_FILTER_SQL} AND {date_filter}")
-        total_tickets = cursor.fetchone()[0]
-
-        return jsonify({
+        return json_response({
             'total_customers': total_customers,
             'active_customers': active_customers,
             'avg_response_hours': round(float(avg_response), 1),
@@ -91,179 +116,168 @@ def api_summary():
         })
     except Exception as e:
         log_error(f"Error fetching analytics summary: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 @bp.route('/api/tickets-by-customer')
+@cached_json()
 def tickets_by_customer():
-    db = get_db()
+    db = get_analytics_db()
     limit = request.args.get('limit', 20, type=int)
-    date_filter = get_date_filter(request.args.get('range'))
+    date_filter = get_date_filter(request.args.get('range'), 'day')
     try:
         cursor = db.cursor()
-        cursor.execute(f"""
-            SELECT customers, COUNT(*) as ticket_count
-            FROM tickets
-            WHERE {GLOBAL_FILTER_SQL} AND {date_filter}
+        cursor.execute(json_array_sql(f"""
+            SELECT customers, SUM(ticket_count) as ticket_count
+            FROM customer_daily
+            WHERE {date_filter}
             GROUP BY customers
-            ORDER BY ticket_count DESC
+            ORDER BY ticket_count DESC, customers
             LIMIT ?
-        """, (limit,))
-        data = [{'customer': row[0], 'count': row[1]} for row in cursor.fetchall()]
-        return jsonify(data)
+        """, customer='customers', count='ticket_count'), (limit,))
+        return raw_json_response(cursor.fetchone()[0])
     except Exception as e:
         log_error(f"Error fetching tickets by customer: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 @bp.route('/api/customer-activity')
+@cached_json()
 def customer_activity():
-    db = get_db()
-    date_filter = get_date_filter(request.args.get('range'))
+    db = get_analytics_db()
+    date_filter = get_date_filter(request.args.get('range'), 'day')
     try:
         cursor = db.cursor()
         # Top 5 customers for the timeline (respect range)
         cursor.execute(f"""
-            SELECT customers FROM tickets 
-            WHERE {GLOBAL_FILTER_SQL} AND {date_filter}
-            GROUP BY customers ORDER BY COUNT(*) DESC LIMIT 5
+            SELECT customers FROM customer_daily 
+            WHERE {date_filter}
+            GROUP BY customers ORDER BY SUM(ticket_count) DESC, customers LIMIT 5
         """)
         top_customers = [row[0] for row in cursor.fetchall()]
         
         if not top_customers:
-            return jsonify([])
+            return json_response([])
 
         placeholders = ', '.join(['?'] * len(top_customers))
         params = top_customers.copy()
         
         cursor.execute(f"""
-            SELECT customers, strftime('%Y-%m', date_ticket_created) as month, COUNT(*) as count
-            FROM tickets
+            SELECT customers, strftime('%Y-%m', day) as month, SUM(ticket_count) as count
+            FROM customer_daily
             WHERE customers IN ({placeholders}) AND {date_filter}
             GROUP BY customers, month
             ORDER BY month ASC
         """, params)
         
         results = cursor.fetchall()
+        
+        # Dense customer x month matrix, filled by position in one pass
+        months = sorted(set(row[1] for row in results))
+        month_index = {month: i for i, month in enumerate(months)}
+        customer_index = {cust: i for i, cust in enumerate(top_customers)}
+        matrix = [[0] * len(months) for _ in top_customers]
+        for cust, month, count in results:
+            matrix[customer_index[cust]][month_index[month]] = count
+        
         # Format for ApexCharts (series per customer)
-        processed = {}
-        for cust in top_customers:
-            processed[cust] = {'name': cust, 'data': []}
-            
-        months = sorted(list(set(row[1] for row in results)))
-        for month in months:
-            for cust in top_customers:
-                # Find count for this customer and month
-                count = next((row[2] for row in results if row[0] == cust and row[1] == month), 0)
-                processed[cust]['data'].append({'x': month, 'y': count})
-                
-        return jsonify(list(processed.values()))
+        series = [
+            {'name': cust, 'data': [{'x': month, 'y': count} for month, count in zip(months, row)]}
+            for cust, row in zip(top_customers, matrix)
+        ]
+        return json_response(series)
     except Exception as e:
         log_error(f"Error fetching customer activity: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 @bp.route('/api/performance-by-customer')
+@cached_json()
 def performance_by_customer():
-    db = get_db()
     limit = request.args.get('limit', 15, type=int)
-    date_filter = get_date_filter(request.args.get('range'))
+    date_filter = get_date_filter(request.args.get('range'), 'day')
     try:
-        cursor = db.cursor()
-        cursor.execute(f"""
+        # The two rankings are independent, so run them concurrently
+        resolution_future = query_executor.submit(fetch_analytics, json_array_sql(f"""
             SELECT 
                 customers,
-                AVG(CAST((julianday(date_closed) - julianday(date_ticket_created)) * 24 AS REAL)) as avg_res
-            FROM tickets
-            WHERE {GLOBAL_FILTER_SQL} AND {date_filter} AND date_closed IS NOT NULL
+                SUM(closed_hours_sum) / SUM(closed_count) as avg_res
+            FROM customer_daily
+            WHERE {date_filter}
             GROUP BY customers
-            ORDER BY avg_res DESC
+            HAVING SUM(closed_count) > 0
+            ORDER BY avg_res DESC, customers
             LIMIT ?
-        """, (limit,))
-        resolution_data = [{'customer': row[0], 'value': round(row[1], 1)} for row in cursor.fetchall()]
-
-        cursor.execute(f"""
+        """, customer='customers', value='round(avg_res, 1)'), (limit,))
+        response_future = query_executor.submit(fetch_analytics, json_array_sql(f"""
             SELECT 
-                t.customers,
-                AVG(CAST((julianday(m.date_action_created) - julianday(t.date_ticket_created)) * 24 AS REAL)) as avg_resp
-            FROM tickets t
-            JOIN messages m ON t.ticket_number = m.ticket_number
-            WHERE {GLOBAL_FILTER_SQL.replace('customers', 't.customers')}
-                AND {date_filter.replace('date_ticket_created', 't.date_ticket_created')}
-                AND m.role = 'Agent' AND m.action_type != 'Description'
-            GROUP BY t.customers
-            ORDER BY avg_resp DESC
+                customers,
+                SUM(response_hours_sum) / SUM(response_count) as avg_resp
+            FROM customer_daily
+            WHERE {date_filter}
+            GROUP BY customers
+            HAVING SUM(response_count) > 0
+            ORDER BY avg_resp DESC, customers
             LIMIT ?
-        """, (limit,))
-        response_data = [{'customer': row[0], 'value': round(row[1], 1)} for row in cursor.fetchall()]
+        """, customer='customers', value='round(avg_resp, 1)'), (limit,))
+        resolution_json = resolution_future.result()[0][0]
+        response_json = response_future.result()[0][0]
 
-        return jsonify({
-            'resolution': resolution_data,
-            'response': response_data
-        })
+        return raw_json_response(f'{{"resolution":{resolution_json},"response":{response_json}}}')
     except Exception as e:
         log_error(f"Error fetching performance data: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 @bp.route('/api/reopened-by-customer')
+@cached_json()
 def reopened_by_customer():
-    db = get_db()
-    date_filter = get_date_filter(request.args.get('range'))
+    db = get_analytics_db()
+    date_filter = get_date_filter(request.args.get('range'), 'day')
     try:
         cursor = db.cursor()
-        cursor.execute(f"""
+        cursor.execute(json_array_sql(f"""
             SELECT 
                 customers,
-                COUNT(DISTINCT ticket_number) as total,
-                SUM(CASE WHEN LOWER(status) = 'reopened' THEN 1 ELSE 0 END) as reopened
-            FROM tickets
-            WHERE {GLOBAL_FILTER_SQL} AND {date_filter}
+                SUM(ticket_count) as total,
+                SUM(reopened_count) as reopened
+            FROM customer_daily
+            WHERE {date_filter}
             GROUP BY customers
             HAVING reopened > 0
-            ORDER BY reopened DESC
+            ORDER BY reopened DESC, customers
             LIMIT 15
-        """)
-        data = []
-        for row in cursor.fetchall():
-            percentage = (row[2] / row[1]) * 100 if row[1] > 0 else 0
-            data.append({
-                'customer': row[0],
-                'count': row[2],
-                'percentage': round(percentage, 1)
-            })
-        return jsonify(data)
+        """, customer='customers', count='reopened',
+            percentage='round(reopened * 100.0 / total, 1)'))
+        return raw_json_response(cursor.fetchone()[0])
     except Exception as e:
         log_error(f"Error fetching reopened tickets: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 @bp.route('/api/churn-at-risk')
+@cached_json()
 def churn_at_risk():
-    db = get_db()
-    date_filter = get_date_filter(request.args.get('range'))
+    db = get_analytics_db()
+    date_filter = get_date_filter(request.args.get('range'), 'day')
     try:
         cursor = db.cursor()
-        cursor.execute(f"""
+        cursor.execute(json_array_sql(f"""
             SELECT 
                 customers,
-                MAX(date_ticket_created) as last_ticket,
-                CAST((julianday('now') - julianday(MAX(date_ticket_created))) AS INTEGER) as days_idle,
-                COUNT(*) as total_history
-            FROM tickets
-            WHERE {GLOBAL_FILTER_SQL} AND {date_filter}
+                MAX(last_ticket) as last_ticket,
+                CAST((julianday('now') - julianday(MAX(last_ticket))) AS INTEGER) as days_idle,
+                SUM(ticket_count) as total_history
+            FROM customer_daily
+            WHERE {date_filter}
             GROUP BY customers
             HAVING days_idle > 90
-            ORDER BY days_idle DESC
+            ORDER BY days_idle DESC, customers
             LIMIT 50
-        """)
-        data = [{
-            'customer': row[0],
-            'last_ticket': row[1],
-            'days_idle': row[2],
-            'total_tickets': row[3]
-        } for row in cursor.fetchall()]
-        return jsonify(data)
+        """, customer='customers', last_ticket='last_ticket', days_idle='days_idle',
+            total_tickets='total_history'))
+        return raw_json_response(cursor.fetchone()[0])
     except Exception as e:
         log_error(f"Error fetching churn data: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 @bp.route('/api/category-breakdown')
+@cached_json()
 def category_breakdown():
     db = get_db()
     customer = request.args.get('customer', '').strip()
@@ -284,12 +298,13 @@ def category_breakdown():
         query += " GROUP BY ticket_type ORDER BY count DESC LIMIT 10"
         cursor.execute(query, params)
         data = [{'category': row[0], 'count': row[1]} for row in cursor.fetchall()]
-        return jsonify(data)
+        return json_response(data)
     except Exception as e:
         log_error(f"Error fetching category breakdown: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 @bp.route('/api/source-distribution')
+@cached_json()
 def source_distribution():
     db = get_db()
     date_filter = get_date_filter(request.args.get('range'))
@@ -304,23 +319,24 @@ def source_distribution():
             ORDER BY count DESC
         """)
         data = [{'source': row[0], 'count': row[1]} for row in cursor.fetchall()]
-        return jsonify(data)
+        return json_response(data)
     except Exception as e:
         log_error(f"Error fetching source distribution: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 @bp.route('/api/loyalty-metrics')
+@cached_json()
 def loyalty_metrics():
-    db = get_db()
-    date_filter = get_date_filter(request.args.get('range'))
+    db = get_analytics_db()
+    date_filter = get_date_filter(request.args.get('range'), 'day')
     try:
         cursor = db.cursor()
         # Segment customers by ticket count (respect range)
         cursor.execute(f"""
             WITH customer_stats AS (
-                SELECT customers, COUNT(*) as total_tickets
-                FROM tickets
-                WHERE {GLOBAL_FILTER_SQL} AND {date_filter}
+                SELECT customers, SUM(ticket_count) as total_tickets
+                FROM customer_daily
+                WHERE {date_filter}
                 GROUP BY customers
             )
             SELECT 
@@ -334,7 +350,7 @@ def loyalty_metrics():
             GROUP BY segment
         """)
         data = [{'segment': row[0], 'count': row[1]} for row in cursor.fetchall()]
-        return jsonify(data)
+        return json_response(data)
     except Exception as e:
         log_error(f"Error fetching loyalty metrics: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
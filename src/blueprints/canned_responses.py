@@ -1,7 +1,9 @@
-from flask import Blueprint, render_template, request, redirect, url_for, g, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, g
 import sqlite3
 from pathlib import Path
-from datetime import datetime
+from ..db import ConnectionPool, READ_PRAGMAS, file_version
+from ._cache import TTLCache
+from ._json import json_response
 
 # Define the Blueprint
 bp = Blueprint('canned_responses', __name__, url_prefix='/canned-responses')
@@ -9,42 +11,109 @@ bp = Blueprint('canned_responses', __name__, url_prefix='/canned-responses')
 # Database Path (relative to this file: src/blueprints/canned_responses.py -> src/../data/kb_articles.db)
 DB_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "kb_articles.db"
 
+def connect_kb_db():
+    """Open a tuned read-only connection to the KB database"""
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for pragma in READ_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+_pool = ConnectionPool(connect_kb_db)
+
 def get_db_connection():
-    """Create database connection to KB database"""
+    """Check out a connection to the KB database for this request"""
     # Check if we already have a connection for this request
     if 'kb_db' not in g:
         if not DB_PATH.exists():
             raise FileNotFoundError(f"KB Database not found at {DB_PATH}")
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        g.kb_db = conn
+        g.kb_db_version = file_version(DB_PATH)
+        g.kb_db = _pool.acquire(g.kb_db_version)
     return g.kb_db
 
-def format_date(date_str):
-    """Format date string for display"""
-    if not date_str:
-        return 'N/A'
-    
-    try:
-        dt = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-        return dt.strftime("%b %d, %Y")
-    except ValueError:
-        return date_str
+def display_date_sql(column):
+    """SQL expression formatting a stored date for display, e.g. 'Jan 05, 2024'.
+
+    Formatting in SQLite saves a strptime/strftime round trip per row in
+    Python. Values not in the stored '%Y-%m-%d %H:%M:%S' format are shown
+    as-is and missing values as 'N/A'.
+    """
+    return f"""
+        CASE
+            WHEN {column} IS NULL OR {column} = '' THEN 'N/A'
+            -- the '+0 days' modifier normalizes impossible dates such as Feb 30
+            WHEN datetime({column}, '+0 days') IS NOT {column} THEN {column}
+            ELSE substr('JanFebMarAprMayJunJulAugSepOctNovDec', strftime('%m', {column}) * 3 - 2, 3)
+                 || strftime(' %d, %Y', {column})
+        END
+    """
+
+# Article rows with their display dates already formatted
+ARTICLE_COLUMNS = f"""
+    kb_articles.*,
+    {display_date_sql('kb_articles.date_modified')} AS date_modified_display,
+    {display_date_sql('kb_articles.date_created')} AS date_created_display
+"""
+
+SORT_FIELDS = ('ticket_number', 'title', 'author', 'date_modified', 'date_created')
+SORT_ORDERS = ('asc', 'desc')
+
+def build_article_queries(total_column=None):
+    """Pre-build the list query for every (search, category, sort, order) combination.
+
+    Requests only pick a string and bind parameters (search text, category,
+    limit, offset in that order), so SQLite's statement cache always hits.
+    """
+    columns = f"{ARTICLE_COLUMNS}, {total_column}" if total_column else ARTICLE_COLUMNS
+    queries = {}
+    for has_search in (False, True):
+        for has_category in (False, True):
+            if has_search:
+                base = f"""
+                    SELECT {columns} FROM kb_articles
+                    INNER JOIN kb_articles_fts ON kb_articles.id = kb_articles_fts.rowid
+                    WHERE kb_articles_fts MATCH ?
+                """
+                if has_category:
+                    base += " AND kb_articles.category_name = ?"
+            else:
+                base = f"SELECT {columns} FROM kb_articles WHERE 1=1"
+                if has_category:
+                    base += " AND category_name = ?"
+            for sort_by in SORT_FIELDS:
+                for sort_order in SORT_ORDERS:
+                    queries[has_search, has_category, sort_by, sort_order] = (
+                        f"{base} ORDER BY {sort_by} {sort_order.upper()} LIMIT ? OFFSET ?"
+                    )
+    return queries
+
+# kb_list reports the size of the whole KB. api_articles reports no total, so
+# its queries can stop at LIMIT instead of visiting every matching row.
+LIST_QUERIES = build_article_queries("(SELECT COUNT(*) FROM kb_articles) AS _total")
+API_QUERIES = build_article_queries()
+
+# Categories only change when kb_articles.db is rebuilt; entries are keyed
+# on the file version so a rebuild is picked up without waiting for the TTL
+CATEGORIES_TTL = 300
+_categories_cache = TTLCache(maxsize=1, ttl=CATEGORIES_TTL)
 
 def get_categories():
-    """Get all unique categories from database"""
+    """Get all unique categories from database (cached)"""
     conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT DISTINCT category_name FROM kb_articles WHERE category_name IS NOT NULL AND category_name != '' ORDER BY category_name")
-    categories = [row['category_name'] for row in cursor.fetchall()]
+    categories = _categories_cache.get(g.kb_db_version)
+    if categories is None:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT category_name FROM kb_articles WHERE category_name IS NOT NULL AND category_name != '' ORDER BY category_name")
+        categories = [row['category_name'] for row in cursor.fetchall()]
+        _categories_cache.set(g.kb_db_version, categories)
     return categories
 
 @bp.teardown_app_request
 def close_db(exception):
-    """Close the database connection at the end of the request"""
+    """Return the database connection to the pool at the end of the request"""
     db = g.pop('kb_db', None)
     if db is not None:
-        db.close()
+        _pool.release(db, g.pop('kb_db_version'))
 
 @bp.route('/')
 def index():
@@ -62,77 +131,56 @@ def kb_list():
     sort_order = request.args.get('order', 'desc')
     
     # Validate sort parameters
-    valid_sort_fields = ['ticket_number', 'title', 'author', 'date_modified', 'date_created']
-    if sort_by not in valid_sort_fields:
+    if sort_by not in SORT_FIELDS:
         sort_by = 'date_modified'
     
-    if sort_order not in ['asc', 'desc']:
+    if sort_order not in SORT_ORDERS:
         sort_order = 'desc'
     
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Build query
-    query = "SELECT * FROM kb_articles WHERE 1=1"
+    query = LIST_QUERIES[bool(search_query), bool(filter_category), sort_by, sort_order]
     params = []
     
     # Apply search filter using FTS
     if search_query:
-        query = """
-            SELECT kb_articles.* FROM kb_articles
-            INNER JOIN kb_articles_fts ON kb_articles.id = kb_articles_fts.rowid
-            WHERE kb_articles_fts MATCH ?
-        """
         params.append(search_query)
-        
-        # Add category filter if present
-        if filter_category:
-            query += " AND kb_articles.category_name = ?"
-            params.append(filter_category)
-    else:
-        # Apply category filter
-        if filter_category:
-            query += " AND category_name = ?"
-            params.append(filter_category)
     
-    # Apply sorting
-    query += f" ORDER BY {sort_by} {sort_order.upper()}"
+    # Apply category filter
+    if filter_category:
+        params.append(filter_category)
     
     # Add limit for initial load (lazy loading)
     limit = request.args.get('limit', 50, type=int)
     offset = request.args.get('offset', 0, type=int)
-    
-    query += f" LIMIT ? OFFSET ?"
     params.extend([limit, offset])
     
     # Execute query
     cursor.execute(query, params)
+    # Rows go to the template as-is: sqlite3.Row supports the same
+    # article.field lookups as a dict, and display dates come from SQL
     articles = cursor.fetchall()
     
-    # Get total count
-    cursor.execute("SELECT COUNT(*) as count FROM kb_articles")
-    result = cursor.fetchone()
-    total_count = result['count'] if result else 0
-    
-    # Format dates for display
-    articles_list = []
-    for article in articles:
-        article_dict = dict(article)
-        article_dict['date_modified_display'] = format_date(article_dict.get('date_modified'))
-        article_dict['date_created_display'] = format_date(article_dict.get('date_created'))
-        articles_list.append(article_dict)
+    # Total article count rides along on every row; only an empty page
+    # needs its own query
+    if articles:
+        total_count = articles[0]['_total']
+    else:
+        cursor.execute("SELECT COUNT(*) as count FROM kb_articles")
+        total_count = cursor.fetchone()['count']
     
     # Get categories for filter dropdown
     categories = get_categories()
     
     return render_template(
         'kb_list.html',
-        articles=articles_list,
+        articles=articles,
         search_query=search_query,
         filter_category=filter_category,
         sort_by=sort_by,
         sort_order=sort_order,
-        filtered_count=len(articles_list),
+        filtered_count=len(articles),
         total_count=total_count,
         categories=categories
     )
@@ -144,18 +192,13 @@ def kb_detail(article_id):
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    cursor.execute("SELECT * FROM kb_articles WHERE id = ?", (article_id,))
+    cursor.execute(f"SELECT {ARTICLE_COLUMNS} FROM kb_articles WHERE id = ?", (article_id,))
     article = cursor.fetchone()
     
     if not article:
         return "Article not found", 404
     
-    # Convert to dict and format dates
-    article_dict = dict(article)
-    article_dict['date_modified_display'] = format_date(article_dict.get('date_modified'))
-    article_dict['date_created_display'] = format_date(article_dict.get('date_created'))
-    
-    return render_template('kb_detail.html', article=article_dict)
+    return render_template('kb_detail.html', article=article)
 
 @bp.route('/api/articles')
 def api_articles():
@@ -168,38 +211,23 @@ def api_articles():
     offset = request.args.get('offset', 0, type=int)
     
     # Validate sort parameters
-    valid_sort_fields = ['ticket_number', 'title', 'author', 'date_modified', 'date_created']
-    if sort_by not in valid_sort_fields:
+    if sort_by not in SORT_FIELDS:
         sort_by = 'date_modified'
     
-    if sort_order not in ['asc', 'desc']:
+    if sort_order not in SORT_ORDERS:
         sort_order = 'desc'
     
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Build query
-    query = "SELECT * FROM kb_articles WHERE 1=1"
+    query = API_QUERIES[bool(search_query), bool(filter_category), sort_by, sort_order]
     params = []
     
     # Apply search filter
     if search_query:
-        query = """
-            SELECT kb_articles.* FROM kb_articles
-            INNER JOIN kb_articles_fts ON kb_articles.id = kb_articles_fts.rowid
-            WHERE kb_articles_fts MATCH ?
-        """
         params.append(search_query)
-        if filter_category:
-            query += " AND kb_articles.category_name = ?"
-            params.append(filter_category)
-    else:
-        if filter_category:
-            query += " AND category_name = ?"
-            params.append(filter_category)
-    
-    query += f" ORDER BY {sort_by} {sort_order.upper()}"
-    query += f" LIMIT ? OFFSET ?"
+    if filter_category:
+        params.append(filter_category)
     params.extend([limit, offset])
     
     cursor.execute(query, params)
@@ -208,13 +236,11 @@ def api_articles():
     articles_list = []
     for article in articles:
         article_dict = dict(article)
-        article_dict['date_modified_display'] = format_date(article_dict.get('date_modified'))
-        article_dict['date_created_display'] = format_date(article_dict.get('date_created'))
         # Include detail URL for frontend
         article_dict['detail_url'] = url_for('canned_responses.kb_detail', article_id=article_dict['id'])
         articles_list.append(article_dict)
     
-    return jsonify({
+    return json_response({
         'articles': articles_list,
         'count': len(articles_list),
         'offset': offset,
@@ -3,8 +3,15 @@ Chat Widget Blueprint
 Handles chat widget Q&A interactions
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 from ..logger import get_logger
+from ._json import encode_json, json_response, raw_json_response
+
+try:
+    # C Aho-Corasick automaton: one pass over the message for all keywords
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 bp = Blueprint('chat_widget', __name__, url_prefix='/api/chat')
 logger = get_logger(__name__)
@@ -41,24 +48,65 @@ QA_DATABASE = {
     }
 }
 
+def build_keyword_automaton(qa_database):
+    """Compile every keyword into one automaton, tagged with its priority."""
+    automaton = ahocorasick.Automaton()
+    for priority, (key, qa) in enumerate(qa_database.items()):
+        automaton.add_word(key, (priority, qa))
+    automaton.make_automaton()
+    return automaton
+
+KEYWORD_AUTOMATON = build_keyword_automaton(QA_DATABASE) if ahocorasick is not None else None
+
+# Questions lowered once at import for the fallback partial-question match
+LOWERED_QUESTIONS = tuple((qa["question"].lower(), qa) for qa in QA_DATABASE.values())
+
+def match_keyword(user_message_lower: str):
+    """Return the Q&A of the first keyword (in QA_DATABASE order) found in the message."""
+    if KEYWORD_AUTOMATON is not None:
+        # Matches arrive by position; keep the earliest-declared keyword
+        matches = [value for _, value in KEYWORD_AUTOMATON.iter(user_message_lower)]
+        return min(matches, key=lambda match: match[0])[1] if matches else None
+    
+    for key, qa in QA_DATABASE.items():
+        if key in user_message_lower:
+            return qa
+    return None
+
+def build_message_body(answer: str) -> bytes:
+    """Serialize the /message response for an answer."""
+    return encode_json({
+        'success': True,
+        'response': answer,
+        'timestamp': None  # Frontend will handle timestamp
+    })
+
+DEFAULT_ANSWER = "I'm sorry, I don't have an answer for that question yet. Please try asking about EHDS, tickets, canned responses, or searching for information."
+
+# Every possible reply is serialized once at import
+ANSWER_BODIES = {
+    answer: build_message_body(answer)
+    for answer in [qa["answer"] for qa in QA_DATABASE.values()] + [DEFAULT_ANSWER]
+}
+
 def find_best_match(user_message: str) -> dict:
     """Find the best matching Q&A based on user message."""
     user_message_lower = user_message.lower().strip()
     
     # Direct keyword matching
-    for key, qa in QA_DATABASE.items():
-        if key in user_message_lower:
-            return qa
+    qa = match_keyword(user_message_lower)
+    if qa is not None:
+        return qa
     
     # Check if any question words match
-    for qa in QA_DATABASE.values():
-        if user_message_lower in qa["question"].lower():
+    for question_lower, qa in LOWERED_QUESTIONS:
+        if user_message_lower in question_lower:
             return qa
     
     # Default response
     return {
         "question": user_message,
-        "answer": "I'm sorry, I don't have an answer for that question yet. Please try asking about EHDS, tickets, canned responses, or searching for information."
+        "answer": DEFAULT_ANSWER
     }
 
 @bp.route('/message', methods=['POST'])
@@ -68,7 +116,7 @@ def chat_message():
         data = request.get_json()
         
         if not data or 'message' not in data:
-            return jsonify({
+            return json_response({
                 'error': 'Message is required'
             }), 400
         
@@ -78,22 +126,20 @@ def chat_message():
         # Find best matching response
         response = find_best_match(user_message)
         
-        return jsonify({
-            'success': True,
-            'response': response['answer'],
-            'timestamp': None  # Frontend will handle timestamp
-        })
+        answer = response['answer']
+        body = ANSWER_BODIES.get(answer)
+        return raw_json_response(body if body is not None else build_message_body(answer))
         
     except Exception as e:
         logger.error(f"Error processing chat message: {str(e)}")
-        return jsonify({
+        return json_response({
             'error': 'An error occurred processing your message'
         }), 500
 
 @bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for the chat widget."""
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'service': 'chat_widget'
     })
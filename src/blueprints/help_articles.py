@@ -2,7 +2,12 @@ from flask import Blueprint, render_template, request, redirect, url_for, g, jso
 import sqlite3
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 import re
+import threading
+from ..db import ConnectionPool, READ_PRAGMAS, file_version
 
 # Define the Blueprint
 bp = Blueprint('help_articles', __name__, url_prefix='/help-articles')
@@ -10,17 +15,48 @@ bp = Blueprint('help_articles', __name__, url_prefix='/help-articles')
 # Database Path (relative to this file: src/blueprints/help_articles.py -> src/../data/help_articles.db)
 DB_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "help_articles.db"
 
+# Articles per page on the list view
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 500
+
+# Article ID at the end of a slug (".../Article_Title-{id}")
+SLUG_ID_RE = re.compile(r'-(\d+)$')
+# Characters that are not alphanumeric, underscore, or hyphen
+SLUG_INVALID_CHARS_RE = re.compile(r'[^\w\-]')
+# Words of a free-text search query
+SEARCH_TOKEN_RE = re.compile(r'\w+')
+
+def connect_help_db():
+    """Open a tuned read-only connection to the Help Articles database"""
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for pragma in READ_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+_pool = ConnectionPool(connect_help_db)
+
 def get_db_connection():
-    """Create database connection to Help Articles database"""
+    """Check out a connection to the Help Articles database for this request"""
     # Check if we already have a connection for this request
     if 'help_db' not in g:
         if not DB_PATH.exists():
             raise FileNotFoundError(f"Help Articles Database not found at {DB_PATH}")
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        g.help_db = conn
+        g.help_db_version = file_version(DB_PATH)
+        g.help_db = _pool.acquire(g.help_db_version)
     return g.help_db
 
+def build_fts_query(search_query):
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+    
+    Raw input can contain FTS5 syntax (hyphens, colons, quotes) that makes
+    MATCH raise, so each word of two or more characters becomes a quoted
+    prefix term and all of them must match. Returns None if no word is left.
+    """
+    tokens = [t for t in SEARCH_TOKEN_RE.findall(search_query) if len(t) >= 2]
+    return ' AND '.join(f'"{t}"*' for t in tokens) or None
+
 def extract_category_from_breadcrumbs(breadcrumbs):
     """Extract main category from breadcrumbs"""
     if not breadcrumbs:
@@ -32,39 +68,62 @@ def extract_category_from_breadcrumbs(breadcrumbs):
         return parts[1]
     return None
 
+# (database file version, navigation) of the last build; the navigation only
+# changes when help_articles.db is rebuilt, so it is shared across requests
+_navigation_cache = (None, None)
+_navigation_lock = threading.Lock()
+
 def build_navigation():
+    """Build navigation structure from articles grouped by category (cached)"""
+    global _navigation_cache
+    
+    version = file_version(DB_PATH)
+    cached_version, navigation = _navigation_cache
+    if navigation is not None and cached_version == version:
+        return navigation
+    
+    with _navigation_lock:
+        # Another request may have rebuilt it while we waited
+        cached_version, navigation = _navigation_cache
+        if navigation is None or cached_version != version:
+            navigation = _build_navigation()
+            _navigation_cache = (version, navigation)
+    return navigation
+
+def _build_navigation():
     """Build navigation structure from articles grouped by category"""
     conn = get_db_connection()
     cursor = conn.cursor()
+    # Plain tuples are cheaper to build than sqlite3.Row
+    cursor.row_factory = None
     
+    # Category is the second breadcrumb ("Support Home > Category > ..."),
+    # extracted in SQL so SQLite sorts the rows into navigation order
     cursor.execute("""
-        SELECT id, article_title, breadcrumbs
-        FROM help_articles
-        ORDER BY breadcrumbs, article_title
+        SELECT id, article_title, COALESCE(NULLIF(TRIM(
+            CASE WHEN instr(breadcrumbs, '>') > 0 THEN
+                CASE WHEN instr(rest, '>') > 0 THEN substr(rest, 1, instr(rest, '>') - 1) ELSE rest END
+            END, char(32, 9, 10, 13)), ''), 'General') AS category
+        FROM (
+            SELECT id, article_title, breadcrumbs,
+                   substr(breadcrumbs, instr(breadcrumbs, '>') + 1) AS rest
+            FROM help_articles
+        )
+        ORDER BY category, breadcrumbs, article_title
     """)
-    articles = cursor.fetchall()
     
-    # Group articles by category
-    categories = {}
-    for article in articles:
-        category = extract_category_from_breadcrumbs(article['breadcrumbs'])
-        if not category:
-            category = "General"
-        
-        if category not in categories:
-            categories[category] = []
-        
-        categories[category].append({
-            'title': article['article_title'],
-            'href': url_for('help_articles.docs_article', article_id=article['id'])
-        })
+    # Build the docs URL prefix once instead of running url_for per article
+    docs_base = url_for('help_articles.docs_article', article_id=0).rsplit('/', 1)[0]
     
-    # Convert to navigation structure
+    # Rows arrive grouped by category, so one pass builds the structure
     navigation = []
-    for category, links in sorted(categories.items()):
+    for category, articles in groupby(cursor, key=itemgetter(2)):
         navigation.append({
             'title': category,
-            'links': links
+            'links': [
+                {'title': title, 'href': f"{docs_base}/{article_id}"}
+                for article_id, title, _ in articles
+            ]
         })
     
     return navigation
@@ -75,7 +134,7 @@ def generate_article_slug(article):
     Format: /help-articles/Category/Subcategory/Article_Title-{id}
     
     Args:
-        article: dict-like object with 'breadcrumbs', 'article_title', and 'id' keys
+        article: dict or sqlite3.Row with 'breadcrumbs', 'article_title', and 'id' keys
     
     Returns:
         str: URL slug (e.g., "Managing_an_Institution/Institution_Dashboard-5")
@@ -83,15 +142,16 @@ def generate_article_slug(article):
     slug_parts = []
     
     # Parse breadcrumbs (skip "Support Home")
-    if article.get('breadcrumbs'):
-        breadcrumb_parts = [p.strip() for p in article['breadcrumbs'].split('>')]
+    breadcrumbs = article['breadcrumbs']
+    if breadcrumbs:
+        breadcrumb_parts = [p.strip() for p in breadcrumbs.split('>')]
         # Skip first element if it's "Support Home"
         for part in breadcrumb_parts[1:] if len(breadcrumb_parts) > 1 else breadcrumb_parts:
             if part:
                 slug_parts.append(sanitize_slug_part(part))
     
     # Add article title
-    title = article.get('article_title', 'Untitled')
+    title = article['article_title']
     slug_parts.append(sanitize_slug_part(title))
     
     # Join parts and append ID
@@ -100,6 +160,7 @@ def generate_article_slug(article):
     
     return slug
 
+@lru_cache(maxsize=4096)
 def sanitize_slug_part(text):
     """
     Sanitize a single part of the URL slug.
@@ -116,16 +177,16 @@ def sanitize_slug_part(text):
     text = text.replace('\\', '-')
     
     # Remove characters that are not alphanumeric, underscore, or hyphen
-    text = re.sub(r'[^\w\-]', '', text)
+    text = SLUG_INVALID_CHARS_RE.sub('', text)
     
     return text
 
 @bp.teardown_app_request
 def close_db(exception):
-    """Close the database connection at the end of the request"""
+    """Return the database connection to the pool at the end of the request"""
     db = g.pop('help_db', None)
     if db is not None:
-        db.close()
+        _pool.release(db, g.pop('help_db_version'))
 
 @bp.route('/')
 def index():
@@ -149,6 +210,10 @@ def help_list():
     if sort_order not in ['asc', 'desc']:
         sort_order = 'asc'
     
+    # Pagination
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', DEFAULT_PER_PAGE, type=int), 1), MAX_PER_PAGE)
+    
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -156,6 +221,10 @@ def help_list():
     query = "SELECT * FROM help_articles WHERE 1=1"
     params = []
     
+    # Total count comes from the cached navigation, which lists every article
+    total_count = sum(len(category['links']) for category in build_navigation())
+    filtered_count = total_count
+    
     # Apply search filter using FTS
     if search_query:
         query = """
@@ -163,44 +232,34 @@ def help_list():
             INNER JOIN help_articles_fts ON help_articles.id = help_articles_fts.rowid
             WHERE help_articles_fts MATCH ?
         """
-        params.append(search_query)
+        # A query without searchable words matches nothing
+        params.append(build_fts_query(search_query) or '""')
+        
+        # Matches are counted on the FTS index alone
+        cursor.execute("SELECT COUNT(*) as count FROM help_articles_fts WHERE help_articles_fts MATCH ?", params)
+        filtered_count = cursor.fetchone()['count']
     
-    # Apply sorting
-    query += f" ORDER BY {sort_by} {sort_order.upper()}"
+    # Apply sorting and fetch only the requested page
+    query += f" ORDER BY {sort_by} {sort_order.upper()} LIMIT ? OFFSET ?"
+    params.extend([per_page, (page - 1) * per_page])
     
     # Execute query
     cursor.execute(query, params)
+    # Rows go to the template as-is; category and intended users are
+    # derived by template filters only for the rows actually rendered
     articles = cursor.fetchall()
     
-    # Get total count
-    cursor.execute("SELECT COUNT(*) as count FROM help_articles")
-    total_count = cursor.fetchone()['count']
-    
-    # Process articles for display
-    articles_list = []
-    for article in articles:
-        article_dict = dict(article)
-        
-        # Extract category from breadcrumbs
-        article_dict['category'] = extract_category_from_breadcrumbs(article_dict.get('breadcrumbs'))
-        
-        # Parse intended users
-        intended_users = article_dict.get('intended_users', '')
-        if intended_users:
-            article_dict['intended_users_list'] = [u.strip() for u in intended_users.split(',') if u.strip()]
-        else:
-            article_dict['intended_users_list'] = []
-        
-        articles_list.append(article_dict)
-    
     return render_template(
         'help_list.html',
-        articles=articles_list,
+        articles=articles,
         search_query=search_query,
         sort_by=sort_by,
         sort_order=sort_order,
-        filtered_count=len(articles_list),
-        total_count=total_count
+        filtered_count=filtered_count,
+        total_count=total_count,
+        page=page,
+        per_page=per_page,
+        total_pages=max((filtered_count + per_page - 1) // per_page, 1)
     )
 
 @bp.route('/<path:article_slug>')
@@ -211,7 +270,7 @@ def help_detail(article_slug):
     """
     
     # Extract article ID from end of slug using regex
-    match = re.search(r'-(\d+)$', article_slug)
+    match = SLUG_ID_RE.search(article_slug)
     if not match:
         return "Article not found", 404
     
@@ -285,15 +344,22 @@ def docs_article(article_id):
     
     article_dict = dict(article)
     
-    # Get previous article
-    cursor.execute("SELECT id, article_title FROM help_articles WHERE id < ? ORDER BY id DESC LIMIT 1", (article_id,))
-    prev_article = cursor.fetchone()
-    prev_article_dict = dict(prev_article) if prev_article else None
-    
-    # Get next article
-    cursor.execute("SELECT id, article_title FROM help_articles WHERE id > ? ORDER BY id ASC LIMIT 1", (article_id,))
-    next_article = cursor.fetchone()
-    next_article_dict = dict(next_article) if next_article else None
+    # Get previous and next articles in one statement
+    cursor.execute("""
+        SELECT * FROM (
+            SELECT 'prev' AS pos, id, article_title FROM help_articles
+            WHERE id < ? ORDER BY id DESC LIMIT 1
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'next' AS pos, id, article_title FROM help_articles
+            WHERE id > ? ORDER BY id ASC LIMIT 1
+        )
+    """, (article_id, article_id))
+    neighbours = {row['pos']: {'id': row['id'], 'article_title': row['article_title']}
+                  for row in cursor.fetchall()}
+    prev_article_dict = neighbours.get('prev')
+    next_article_dict = neighbours.get('next')
     
     # Build navigation
     navigation = build_navigation()
@@ -311,13 +377,14 @@ def docs_article(article_id):
 @bp.route('/api/search')
 def api_search():
     """API endpoint for search functionality (v2)"""
-    query = request.args.get('q', '').strip()
+    query = build_fts_query(request.args.get('q', ''))
     
     if not query:
         return jsonify([])
     
     conn = get_db_connection()
     cursor = conn.cursor()
+    cursor.row_factory = None
     
     # Use FTS for search
     cursor.execute("""
@@ -325,16 +392,34 @@ def api_search():
         FROM help_articles
         INNER JOIN help_articles_fts ON help_articles.id = help_articles_fts.rowid
         WHERE help_articles_fts MATCH ?
+        ORDER BY bm25(help_articles_fts)
         LIMIT 10
     """, (query,))
     
-    results = cursor.fetchall()
-    
     # Convert to JSON-serializable format
-    results_list = [dict(row) for row in results]
+    results_list = [
+        {'id': article_id, 'article_title': title, 'breadcrumbs': breadcrumbs}
+        for article_id, title, breadcrumbs in cursor.fetchall()
+    ]
     
     return jsonify(results_list)
 
+@bp.app_template_filter('breadcrumb_category')
+def breadcrumb_category_filter(breadcrumbs):
+    """
+    Template filter to extract the main category from breadcrumbs.
+    Usage: {{ article.breadcrumbs|breadcrumb_category }}
+    """
+    return extract_category_from_breadcrumbs(breadcrumbs)
+
+@bp.app_template_filter('split_users')
+def split_users_filter(intended_users):
+    """
+    Template filter to split the comma-separated intended users.
+    Usage: {{ article.intended_users|split_users }}
+    """
+    return [u.strip() for u in (intended_users or '').split(',') if u.strip()]
+
 @bp.app_template_filter('article_url')
 def article_url_filter(article):
     """
@@ -1,8 +1,74 @@
 import sqlite3
 import os
+import queue
+from contextlib import contextmanager
 from pathlib import Path
 from flask import g, current_app
 
+# The app only reads, so tuning is limited to the read side: a large page
+# cache, memory-mapped I/O and in-memory temp tables for GROUP BY/ORDER BY
+READ_PRAGMAS = [
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+]
+
+# Idle connections kept per database file
+POOL_SIZE = 8
+
+
+class ConnectionPool:
+    """Reuse connections across requests so their page cache stays warm.
+
+    Connections are tied to the file they were opened on; when the file is
+    rebuilt (new mtime) idle connections are dropped and reopened lazily.
+    """
+
+    def __init__(self, connect, size=POOL_SIZE):
+        self._connect = connect
+        # LIFO hands out the most recently used (hottest) connection first
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._version = None
+
+    def _drain(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def acquire(self, version):
+        if version != self._version:
+            self._version = version
+            self._drain()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn, version):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        if version != self._version:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def file_version(path):
+    """Identify the current contents of a database file."""
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
 # The main.py had this logic:
 # DB_PATH = os.getenv("DATABASE_PATH")
 # if DB_PATH:
@@ -17,30 +83,66 @@ def get_db_path():
     # Relative to this file (src/db.py), parent is src, parent parent is project root
     return Path(__file__).resolve().parent.parent / "data" / "teamsupport.db"
 
+def get_kb_path(db_path):
+    """The KB database lives next to the main one and is attached to it."""
+    return db_path.parent / "kb_articles.db"
+
+_pools = {}
+
+def connect_db(db_path):
+    """Open a tuned read-only connection with the KB database attached."""
+    # Pooled connections move between worker threads, one request at a time
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for pragma in READ_PRAGMAS:
+        conn.execute(pragma)
+    
+    # Attach KB database
+    kb_path = get_kb_path(db_path)
+    if kb_path.exists():
+        try:
+            conn.execute(f"ATTACH DATABASE '{kb_path}' AS kb")
+        except sqlite3.OperationalError:
+            # Silent failure or log if app context available
+            pass
+    return conn
+
+def get_pool():
+    """Return the connection pool for the configured database."""
+    db_path = get_db_path()
+    # One stat both checks the file exists and versions the pool
+    version = file_version(db_path)
+    if version is None:
+        # Import logger here to avoid circularity if needed, or just raise
+        raise FileNotFoundError(f"Database {db_path} not found!")
+    # Connections attach kb_articles.db when they open, so rebuilding either
+    # file must drain the pool
+    version = (version, file_version(get_kb_path(db_path)))
+    
+    pool = _pools.get(db_path)
+    if pool is None:
+        pool = _pools.setdefault(db_path, ConnectionPool(lambda: connect_db(db_path)))
+    return pool, version
+
 def get_db():
     """Get database connection for current request."""
     if 'db' not in g:
-        db_path = get_db_path()
-        if not db_path.exists():
-            # Import logger here to avoid circularity if needed, or just raise
-            raise FileNotFoundError(f"Database {db_path} not found!")
-            
-        # Connect in read-only mode
-        g.db = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
-        g.db.row_factory = sqlite3.Row
-        
-        # Attach KB database
-        kb_path = db_path.parent / "kb_articles.db"
-        if kb_path.exists():
-            try:
-                g.db.execute(f"ATTACH DATABASE '{kb_path}' AS kb")
-            except sqlite3.OperationalError:
-                # Silent failure or log if app context available
-                pass
+        g.db_pool, g.db_version = get_pool()
+        g.db = g.db_pool.acquire(g.db_version)
     return g.db
 
+@contextmanager
+def pooled_db():
+    """Check out a connection of its own, e.g. for a query run on another thread."""
+    pool, version = get_pool()
+    conn = pool.acquire(version)
+    try:
+        yield conn
+    finally:
+        pool.release(conn, version)
+
 def close_db(e=None):
-    """Close database connection at end of request."""
+    """Return the request's connection to its pool."""
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        g.pop('db_pool').release(db, g.pop('db_version'))
@@ -3,8 +3,11 @@ PDF Generator for TeamSupport Ticket Summaries
 Generates professional enterprise-grade PDF reports for support tickets.
 """
 
+import copy
+import html
 import io
 from datetime import datetime
+from functools import lru_cache
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -15,9 +18,28 @@ from reportlab.platypus import (
 )
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 
+# Label/value layout shared by the overview, people and timeline tables;
+# sections add their own highlight commands on top
+META_COL_WIDTHS = [1.5*inch, 4.5*inch]
+META_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#6b7280')),
+    ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#1f2937')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+])
 
+
+@lru_cache(maxsize=None)
 def get_styles():
-    """Create custom paragraph styles for the PDF."""
+    """
+    Create custom paragraph styles for the PDF.
+    
+    The stylesheet is built once and shared by every PDF; callers only read
+    styles from it and must not modify it.
+    """
     styles = getSampleStyleSheet()
     
     # Header title style
@@ -139,19 +161,42 @@ def get_styles():
     return styles
 
 
+@lru_cache(maxsize=None)
+def _section_header_template(title: str) -> Paragraph:
+    """Parse a fixed section header once."""
+    return Paragraph(title, get_styles()['SectionHeader'])
+
+
+def section_header(title: str) -> Paragraph:
+    """
+    Return a paragraph for a fixed section header.
+    
+    The markup is parsed once per title; each PDF gets a shallow copy so
+    layout state set during the build is never shared between documents.
+    """
+    return copy.copy(_section_header_template(title))
+
+
 def format_date(date_str: str) -> str:
     """Format date string for display."""
     if not date_str or date_str == 'None' or date_str == 'N/A':
         return 'N/A'
     try:
-        dt = datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S')
+        # Timestamps are ISO 'YYYY-MM-DD HH:MM:SS'; fromisoformat is far cheaper than strptime
+        dt = datetime.fromisoformat(date_str)
         return dt.strftime('%m/%d/%y %I:%M %p')
     except (ValueError, TypeError):
         return str(date_str)
 
 
+@lru_cache(maxsize=64)
 def get_status_color(status: str) -> colors.Color:
-    """Return color based on status."""
+    """
+    Return color based on status.
+    
+    Statuses come from a small vocabulary, so results are memoized; the
+    substring checks run once per distinct status.
+    """
     if not status:
         return colors.HexColor('#6b7280')
     
@@ -171,15 +216,8 @@ def clean_text_for_pdf(text: str) -> str:
     """Clean text for safe PDF rendering."""
     if not text:
         return ''
-    # Replace problematic characters
-    text = str(text)
-    # Handle XML special characters
-    text = text.replace('&', '&amp;')
-    text = text.replace('<', '&lt;')
-    text = text.replace('>', '&gt;')
-    # Replace tabs and multiple spaces
-    text = text.replace('\t', '    ')
-    return text
+    # Escape XML special characters (&, <, >), then expand tabs
+    return html.escape(str(text), quote=False).replace('\t', '    ')
 
 
 def create_header_section(styles, ticket_info: dict) -> list:
@@ -210,7 +248,7 @@ def create_overview_section(styles, ticket_info: dict) -> list:
     """Create the ticket overview section."""
     elements = []
     
-    elements.append(Paragraph("📋 TICKET OVERVIEW", styles['SectionHeader']))
+    elements.append(section_header("📋 TICKET OVERVIEW"))
     
     # Create overview table
     status = ticket_info.get('status', 'Unknown')
@@ -223,16 +261,10 @@ def create_overview_section(styles, ticket_info: dict) -> list:
         ['Source:', ticket_info.get('ticket_source', 'N/A') or 'N/A'],
     ]
     
-    table = Table(data, colWidths=[1.5*inch, 4.5*inch])
+    table = Table(data, colWidths=META_COL_WIDTHS)
+    table.setStyle(META_TABLE_STYLE)
     table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#6b7280')),
-        ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#1f2937')),
         ('TEXTCOLOR', (1, 0), (1, 0), status_color),  # Status color
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
     ]))
     
     elements.append(table)
@@ -245,7 +277,7 @@ def create_people_section(styles, ticket_info: dict) -> list:
     """Create the people section."""
     elements = []
     
-    elements.append(Paragraph("👥 PEOPLE", styles['SectionHeader']))
+    elements.append(section_header("👥 PEOPLE"))
     
     data = [
         ['Contact:', ticket_info.get('ticket_owner', 'Unknown') or 'Unknown'],
@@ -253,16 +285,8 @@ def create_people_section(styles, ticket_info: dict) -> list:
         ['Customer:', ticket_info.get('customers', 'Unknown') or 'Unknown'],
     ]
     
-    table = Table(data, colWidths=[1.5*inch, 4.5*inch])
-    table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#6b7280')),
-        ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#1f2937')),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-    ]))
+    table = Table(data, colWidths=META_COL_WIDTHS)
+    table.setStyle(META_TABLE_STYLE)
     
     elements.append(table)
     elements.append(Spacer(1, 10))
@@ -274,7 +298,7 @@ def create_timeline_section(styles, ticket_info: dict) -> list:
     """Create the timeline section."""
     elements = []
     
-    elements.append(Paragraph("🕐 TIMELINE", styles['SectionHeader']))
+    elements.append(section_header("🕐 TIMELINE"))
     
     created = format_date(ticket_info.get('date_ticket_created', ''))
     closed = format_date(ticket_info.get('date_closed', ''))
@@ -284,16 +308,10 @@ def create_timeline_section(styles, ticket_info: dict) -> list:
         ['Closed:', closed],
     ]
     
-    table = Table(data, colWidths=[1.5*inch, 4.5*inch])
+    table = Table(data, colWidths=META_COL_WIDTHS)
+    table.setStyle(META_TABLE_STYLE)
     table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#6b7280')),
-        ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#1f2937')),
         ('TEXTCOLOR', (0, 0), (0, 0), colors.HexColor('#059669')),  # Created - green
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
     ]))
     
     elements.append(table)
@@ -329,11 +347,12 @@ def create_messages_section(styles, messages: list) -> list:
         
         # Get message body - prefer cleaned_description
         body = msg.get('cleaned_description', '') or msg.get('action_description', '') or ''
-        body = clean_text_for_pdf(body)
         
-        # Truncate very long messages for PDF (keep first 3000 chars)
+        # Truncate very long messages for PDF (keep first 3000 chars), before
+        # escaping so the rest is never processed and no entity is cut in half
         if len(body) > 3000:
             body = body[:3000] + "... [Message truncated]"
+        body = clean_text_for_pdf(body)
         
         # Role badge
         is_agent = role == 'Agent'
@@ -347,13 +366,8 @@ def create_messages_section(styles, messages: list) -> list:
         
         # Message body - handle line breaks
         if body:
-            # Split by newlines and create paragraphs
-            lines = body.split('\n')
-            for line in lines:
-                if line.strip():
-                    elements.append(Paragraph(line, styles['MessageBody']))
-                else:
-                    elements.append(Spacer(1, 6))
+            # One paragraph per message; ReportLab breaks lines on <br/>
+            elements.append(Paragraph(body.replace('\n', '<br/>'), styles['MessageBody']))
         else:
             elements.append(Paragraph("[No message content]", styles['MessageBody']))
         
@@ -389,18 +403,21 @@ def add_page_number(canvas, doc):
     canvas.restoreState()
 
 
-def generate_ticket_pdf(ticket_info: dict, messages: list) -> io.BytesIO:
+def generate_ticket_pdf(ticket_info: dict, messages: list, buffer=None):
     """
     Generate a professional PDF summary for a support ticket.
     
     Args:
         ticket_info: Dictionary containing ticket metadata
         messages: List of message dictionaries
+        buffer: Optional binary file object to write the PDF into
+            (defaults to a new BytesIO)
     
     Returns:
-        BytesIO buffer containing the PDF
+        The buffer containing the PDF, rewound to the start
     """
-    buffer = io.BytesIO()
+    if buffer is None:
+        buffer = io.BytesIO()
     
     # Create document
     doc = SimpleDocTemplate(
@@ -9,12 +9,15 @@ Logs are written to:
   - logs/access.log (request/usage tracking)
 """
 
+import atexit
 import logging
 import os
+import queue
 import sys
-from datetime import datetime
+import threading
+import time
 from functools import wraps
-from logging.handlers import RotatingFileHandler
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 # === Constants ===
@@ -27,6 +30,73 @@ DETAILED_FORMAT = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
 ACCESS_FORMAT = "%(asctime)s | %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# File writes are batched: records are buffered in memory and written when
+# the buffer fills, an ERROR arrives, or the periodic flush runs
+BUFFER_CAPACITY = 512
+FLUSH_INTERVAL = 1.0  # seconds
+
+_buffered_handlers = []
+_flush_thread = None
+
+# Handlers run on background listener threads; request threads only enqueue
+_listeners = []
+
+# Logger objects are process-wide singletons, so they are looked up once
+_app_logger = logging.getLogger("teamsupport")
+_access_logger = logging.getLogger("teamsupport.access")
+
+
+def flush_log_buffers():
+    """Write out all buffered log records."""
+    for handler in list(_buffered_handlers):
+        handler.flush()
+
+
+def _flush_periodically():
+    """Bound how long a buffered record can wait before reaching disk."""
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        flush_log_buffers()
+
+
+def buffered(target):
+    """Wrap a file handler so its records are written in batches."""
+    global _flush_thread
+    
+    handler = MemoryHandler(
+        BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=target,
+        flushOnClose=True
+    )
+    handler.setLevel(target.level)
+    _buffered_handlers.append(handler)
+    
+    if _flush_thread is None:
+        _flush_thread = threading.Thread(target=_flush_periodically, name="log-flush", daemon=True)
+        _flush_thread.start()
+    return handler
+
+
+def start_listener(logger, *handlers):
+    """Route a logger's records through a queue to handlers on a background thread."""
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return listener
+
+
+def shutdown_logging():
+    """Drain the log queues and write out all buffered records."""
+    while _listeners:
+        _listeners.pop().stop()
+    flush_log_buffers()
+
+
+atexit.register(shutdown_logging)
+
 
 def setup_logging(app=None, log_level=None):
     """
@@ -42,13 +112,17 @@ def setup_logging(app=None, log_level=None):
     # Create logs directory if it doesn't exist
     LOG_DIR.mkdir(parents=True, exist_ok=True)
     
+    # Stop listeners and drop buffers left by a previous setup (e.g. on reload)
+    shutdown_logging()
+    _buffered_handlers.clear()
+    
     # Determine log level
     if log_level is None:
         debug_mode = os.getenv("FLASK_DEBUG", "0") == "1"
         log_level = logging.DEBUG if debug_mode else logging.INFO
     
     # === Application Logger (main.py and general app logs) ===
-    app_logger = logging.getLogger("teamsupport")
+    app_logger = _app_logger
     app_logger.setLevel(log_level)
     app_logger.handlers.clear()  # Prevent duplicate handlers on reload
     
@@ -56,7 +130,6 @@ def setup_logging(app=None, log_level=None):
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(logging.Formatter(DETAILED_FORMAT, DATE_FORMAT))
-    app_logger.addHandler(console_handler)
     
     # File handler for general logs (rotating)
     app_file_handler = RotatingFileHandler(
@@ -67,7 +140,6 @@ def setup_logging(app=None, log_level=None):
     )
     app_file_handler.setLevel(log_level)
     app_file_handler.setFormatter(logging.Formatter(DETAILED_FORMAT, DATE_FORMAT))
-    app_logger.addHandler(app_file_handler)
     
     # === Error Logger (errors only, separate file) ===
     error_handler = RotatingFileHandler(
@@ -78,10 +150,11 @@ def setup_logging(app=None, log_level=None):
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(logging.Formatter(DETAILED_FORMAT, DATE_FORMAT))
-    app_logger.addHandler(error_handler)
+    
+    app_listener = start_listener(app_logger, console_handler, buffered(app_file_handler), error_handler)
     
     # === Access Logger (request tracking) ===
-    access_logger = logging.getLogger("teamsupport.access")
+    access_logger = _access_logger
     access_logger.setLevel(logging.INFO)
     access_logger.handlers.clear()
     access_logger.propagate = False  # Don't send to parent logger
@@ -93,23 +166,27 @@ def setup_logging(app=None, log_level=None):
         encoding="utf-8"
     )
     access_file_handler.setFormatter(logging.Formatter(ACCESS_FORMAT, DATE_FORMAT))
-    access_logger.addHandler(access_file_handler)
+    access_listener = start_listener(access_logger, buffered(access_file_handler))
     
     # === Flask Integration ===
     if app is not None:
         # Attach loggers to Flask app
         app.logger.handlers = app_logger.handlers
         app.logger.setLevel(log_level)
+        app.extensions['log_listeners'] = [app_listener, access_listener]
         
         # Configure Werkzeug logging (HTTP server logs)
         werkzeug_logger = logging.getLogger("werkzeug")
         werkzeug_logger.setLevel(logging.WARNING)  # Reduce noise
     
-    app_logger.info("=" * 60)
-    app_logger.info("TeamSupport Archive Viewer - Logging initialized")
-    app_logger.info(f"Log directory: {LOG_DIR}")
-    app_logger.info(f"Log level: {logging.getLevelName(log_level)}")
-    app_logger.info("=" * 60)
+    # Startup banner as a single record (one dispatch to each handler)
+    app_logger.info("\n".join([
+        "=" * 60,
+        "TeamSupport Archive Viewer - Logging initialized",
+        f"Log directory: {LOG_DIR}",
+        f"Log level: {logging.getLevelName(log_level)}",
+        "=" * 60,
+    ]))
     
     return app_logger
 
@@ -124,12 +201,14 @@ def get_logger(name: str = "teamsupport") -> logging.Logger:
     Returns:
         logging.Logger: Logger instance
     """
+    if name == "teamsupport":
+        return _app_logger
     return logging.getLogger(name)
 
 
 def get_access_logger() -> logging.Logger:
     """Get the access/request logger."""
-    return logging.getLogger("teamsupport.access")
+    return _access_logger
 
 
 class RequestLogger:
@@ -155,7 +234,7 @@ class RequestLogger:
         @app.before_request
         def log_request_start():
             """Record request start time."""
-            g.request_start_time = datetime.now()
+            g.request_start_time = time.perf_counter()
         
         @app.after_request
         def log_request_end(response):
@@ -163,8 +242,7 @@ class RequestLogger:
             # Calculate request duration
             duration_ms = 0
             if hasattr(g, 'request_start_time'):
-                duration = datetime.now() - g.request_start_time
-                duration_ms = duration.total_seconds() * 1000
+                duration_ms = (time.perf_counter() - g.request_start_time) * 1000
             
             # Build log message
             client_ip = request.remote_addr or "-"
@@ -186,11 +264,12 @@ class RequestLogger:
             
             # Log level based on status code
             if status_code >= 500:
-                self.logger.error(log_msg)
+                level = logging.ERROR
             elif status_code >= 400:
-                self.logger.warning(log_msg)
+                level = logging.WARNING
             else:
-                self.logger.info(log_msg)
+                level = logging.INFO
+            self.logger.log(level, log_msg)
             
             return response
         
@@ -234,16 +313,21 @@ def log_function_call(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         func_name = func.__name__
-        logger.debug(f"Calling {func_name}")
+        # Checked per call so level changes take effect; the messages are
+        # only built when DEBUG is on
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Calling %s", func_name)
         
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         try:
             result = func(*args, **kwargs)
-            duration = (datetime.now() - start_time).total_seconds() * 1000
-            logger.debug(f"{func_name} completed in {duration:.1f}ms")
+            if debug:
+                duration = (time.perf_counter() - start_time) * 1000
+                logger.debug("%s completed in %.1fms", func_name, duration)
             return result
         except Exception as e:
-            duration = (datetime.now() - start_time).total_seconds() * 1000
+            duration = (time.perf_counter() - start_time) * 1000
             logger.error(f"{func_name} failed after {duration:.1f}ms: {e}")
             raise
     
@@ -251,10 +335,13 @@ def log_function_call(func):
 
 
 # === Convenience logging functions ===
+# Each returns before building the context string when its level is disabled
 
 def log_info(message: str, **kwargs):
     """Log an info message with optional context."""
-    logger = get_logger()
+    logger = _app_logger
+    if not logger.isEnabledFor(logging.INFO):
+        return
     if kwargs:
         context = " | ".join(f"{k}={v}" for k, v in kwargs.items())
         message = f"{message} | {context}"
@@ -263,7 +350,9 @@ def log_info(message: str, **kwargs):
 
 def log_warning(message: str, **kwargs):
     """Log a warning message with optional context."""
-    logger = get_logger()
+    logger = _app_logger
+    if not logger.isEnabledFor(logging.WARNING):
+        return
     if kwargs:
         context = " | ".join(f"{k}={v}" for k, v in kwargs.items())
         message = f"{message} | {context}"
@@ -272,7 +361,9 @@ def log_warning(message: str, **kwargs):
 
 def log_error(message: str, exc_info: bool = False, **kwargs):
     """Log an error message with optional exception traceback."""
-    logger = get_logger()
+    logger = _app_logger
+    if not logger.isEnabledFor(logging.ERROR):
+        return
     if kwargs:
         context = " | ".join(f"{k}={v}" for k, v in kwargs.items())
         message = f"{message} | {context}"
@@ -281,7 +372,9 @@ def log_error(message: str, exc_info: bool = False, **kwargs):
 
 def log_debug(message: str, **kwargs):
     """Log a debug message with optional context."""
-    logger = get_logger()
+    logger = _app_logger
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     if kwargs:
         context = " | ".join(f"{k}={v}" for k, v in kwargs.items())
         message = f"{message} | {context}"
@@ -6,6 +6,7 @@ Uses SQLite database for fast queries and lazy loading.
 Run migration first: python migrate_to_sqlite.py
 """
 
+import calendar
 import os
 import re
 import sqlite3
@@ -59,6 +60,46 @@ def teardown_db(exception):
 
 # === Helper Functions ===
 
+# Agents whose sign-offs mark the start of a signature
+AGENT_NAMES = [
+    'Nadia Clark', 'Nadia',
+    'Vinod Rajendran', 'Vinod',
+    'Sook-Theng Chow', 'Sook',
+    'William Lai', 'William',
+    'Elvira Carrera', 'Elvira',
+    'Sophie Katsarova', 'Sophie',
+    'Guilherme Vieira Machado', 'Guilherme Vieira-Machado', 'Guilherme',
+]
+
+# Compiled once; extract_signature runs for every message on a ticket page.
+# Both start with a DOTALL (.*?) that absorbs any prefix, so they are used
+# with .match(): .search() would retry every start offset, which is
+# quadratic on long messages without a signature.
+SIGNATURE_GREETING_RE = re.compile(rf'''
+    (.*?)
+    (
+        (?:Thanks|Thank\s*you|Regards|Best|Best\s*regards|Cheers|Sincerely|Warm\s*regards|Kind\s*regards|Many\s*thanks)
+        [,!]?\s*\n
+        (?:{'|'.join(re.escape(name) for name in AGENT_NAMES)})
+        .*
+    )
+    $
+''', flags=re.IGNORECASE | re.DOTALL | re.VERBOSE)
+
+# Nadia-specific pattern
+NADIA_SIGNATURE_RE = re.compile(r'''
+    (.*?)
+    (
+        \n
+        Nadia
+        \s*\n
+        \n?
+        Nadia\s+D\.?\s+Clark
+        .+
+    )
+    $
+''', flags=re.IGNORECASE | re.DOTALL | re.VERBOSE)
+
 def extract_signature(text: str) -> tuple[str, str]:
     """
     Detect and extract email signature from message body.
@@ -67,49 +108,12 @@ def extract_signature(text: str) -> tuple[str, str]:
     if not text:
         return text, ""
     
-    agent_names = [
-        'Nadia Clark', 'Nadia',
-        'Vinod Rajendran', 'Vinod',
-        'Sook-Theng Chow', 'Sook',
-        'William Lai', 'William',
-        'Elvira Carrera', 'Elvira',
-        'Sophie Katsarova', 'Sophie',
-        'Guilherme Vieira Machado', 'Guilherme Vieira-Machado', 'Guilherme',
-    ]
-    
-    names_pattern = '|'.join(re.escape(name) for name in agent_names)
-    
-    greeting_pattern = rf'''
-        (.*?)
-        (
-            (?:Thanks|Thank\s*you|Regards|Best|Best\s*regards|Cheers|Sincerely|Warm\s*regards|Kind\s*regards|Many\s*thanks)
-            [,!]?\s*\n
-            (?:{names_pattern})
-            .*
-        )
-        $
-    '''
-    
-    match = re.search(greeting_pattern, text, flags=re.IGNORECASE | re.DOTALL | re.VERBOSE)
+    match = SIGNATURE_GREETING_RE.match(text)
     
     if match:
         return match.group(1).strip(), match.group(2).strip()
     
-    # Nadia-specific pattern
-    nadia_pattern = rf'''
-        (.*?)
-        (
-            \n
-            Nadia
-            \s*\n
-            \n?
-            Nadia\s+D\.?\s+Clark
-            .+
-        )
-        $
-    '''
-    
-    match = re.search(nadia_pattern, text, flags=re.IGNORECASE | re.DOTALL | re.VERBOSE)
+    match = NADIA_SIGNATURE_RE.match(text)
     
     if match:
         return match.group(1).strip(), match.group(2).strip()
@@ -117,20 +121,22 @@ def extract_signature(text: str) -> tuple[str, str]:
     return text, ""
 
 
+URL_RE = re.compile(r'(https?://[^\s<>"\')]+)')
+
+
+def _url_link(match):
+    url = match.group(1).rstrip('.,;:!?)')
+    return f'<a href="{url}" target="_blank" class="text-blue-600 hover:underline">{url}</a>'
+
+
 def linkify_urls(text: str) -> str:
     """Convert plain URLs to clickable links."""
     if not text:
         return ""
+    if '://' not in text:
+        return text
     
-    url_pattern = r'(https?://[^\s<>"\')]+)'
-    
-    def replace_url(match):
-        url = match.group(1)
-        while url and url[-1] in '.,;:!?)':
-            url = url[:-1]
-        return f'<a href="{url}" target="_blank" class="text-blue-600 hover:underline">{url}</a>'
-    
-    return re.sub(url_pattern, replace_url, text)
+    return URL_RE.sub(_url_link, text)
 
 
 def format_iso_date(iso_str: str, format_str: str = '%m/%d/%y %I:%M %p') -> str:
@@ -138,20 +144,42 @@ def format_iso_date(iso_str: str, format_str: str = '%m/%d/%y %I:%M %p') -> str:
     if not iso_str or iso_str == 'None':
         return 'N/A'
     try:
-        if 'T' in iso_str:
-            dt = datetime.fromisoformat(iso_str)
-        else:
+        # Stored timestamps are 'YYYY-MM-DD HH:MM:SS' (or with a 'T'), which
+        # fromisoformat parses in C; strptime only handles the odd unpadded value
+        dt = datetime.fromisoformat(iso_str)
+    except ValueError:
+        try:
             try:
                 dt = datetime.strptime(iso_str, '%Y-%m-%d %H:%M:%S')
             except ValueError:
                 dt = datetime.strptime(iso_str, '%Y-%m-%d')
-        return dt.strftime(format_str)
-    except (ValueError, TypeError):
+        except ValueError:
+            return str(iso_str)
+    except TypeError:
         return str(iso_str)
+    return dt.strftime(format_str)
 
 
 # === Data Access Layer ===
 
+# (database version, whether the tickets_fts search index exists)
+_ticket_search_index_cache = (None, False)
+
+
+def has_ticket_search_index() -> bool:
+    """Whether the database has the trigram index on ticket names (newer migrations)."""
+    global _ticket_search_index_cache
+    
+    db = get_db()
+    cached_version, present = _ticket_search_index_cache
+    if cached_version != g.db_version:
+        present = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tickets_fts'"
+        ).fetchone() is not None
+        _ticket_search_index_cache = (g.db_version, present)
+    return present
+
+
 def get_filtered_query_parts(search_query: str = None, filters: dict = None, exclude_field: str = None):
     """
     Helper to generate SQL WHERE clauses and parameters for unified query.
@@ -173,7 +201,14 @@ def get_filtered_query_parts(search_query: str = None, filters: dict = None, exc
     if search_query:
         query_param = f"%{search_query}%"
         
-        ticket_conditions.append("(CAST(ticket_number AS TEXT) LIKE ? OR LOWER(ticket_name) LIKE LOWER(?))")
+        if has_ticket_search_index():
+            # Same LIKE match, answered by the trigram index instead of a scan
+            ticket_conditions.append(
+                "(CAST(ticket_number AS TEXT) LIKE ? OR "
+                "ticket_number IN (SELECT rowid FROM tickets_fts WHERE ticket_name LIKE ?))"
+            )
+        else:
+            ticket_conditions.append("(CAST(ticket_number AS TEXT) LIKE ? OR LOWER(ticket_name) LIKE LOWER(?))")
         ticket_params.extend([query_param, query_param])
         
         kb_conditions.append("(LOWER(title) LIKE LOWER(?) OR CAST(ticket_number AS TEXT) LIKE ?)")
@@ -325,150 +360,142 @@ def get_filtered_query_parts(search_query: str = None, filters: dict = None, exc
     )
 from datetime import timedelta # Ensure timedelta is available
 
+# Facets, in display order, with the expression each one groups on
+FACET_FIELDS = {
+    'agent': 'agent',
+    'status': 'status',
+    'category': 'category',
+    'subcategory': 'subcategory',
+    'customer': 'customer',
+    'year': "strftime('%Y', date_val)",
+    'month': "strftime('%m', date_val)",
+}
+# Field facets skip empty values and keep the top 50; year/month skip rows without a date
+FACET_LIMIT = 50
+DATE_FACETS = ('year', 'month')
+
+
+def build_facet_sql(t_where: str, k_where: str, facet_keys: list) -> str:
+    """One query counting several facets over a single scan of the unified items."""
+    branches = []
+    for key in facet_keys:
+        expr = FACET_FIELDS[key]
+        if key in DATE_FACETS:
+            condition = "date_val IS NOT NULL"
+        else:
+            condition = f"{expr} IS NOT NULL AND {expr} != ''"
+        branches.append(f"""
+            SELECT '{key}' AS facet, {expr} AS value, COUNT(*) AS c
+            FROM unified_items
+            WHERE {condition}
+            GROUP BY value
+        """)
+    
+    # unified_items is referenced by every branch, so SQLite materializes it once
+    return f"""
+        WITH unified_items AS (
+            SELECT 
+                assigned_to as agent,
+                status,
+                ticket_type as category,
+                subcategory,
+                customers as customer,
+                date_action_created as date_val
+            FROM tickets
+            WHERE {t_where}
+            
+            UNION ALL
+            
+            SELECT 
+                author as agent,
+                'Canned Response' as status,
+                kb_parent_category_name as category,
+                kb_category_name as subcategory,
+                '' as customer,
+                COALESCE(date_modified, date_created) as date_val
+            FROM kb.kb_articles
+            WHERE {k_where}
+        )
+        SELECT facet, value, c FROM (
+            {' UNION ALL '.join(branches)}
+        )
+        ORDER BY facet, value
+    """
+
+
 def get_facets(search_query: str = None, filters: dict = None) -> dict:
     """Calculate facet counts with exclusion logic for multi-select friendliness."""
     db = get_db()
     cursor = db.cursor()
     
-    facets = {}
-
-    # Define helper to get counts for a specific field, excluding its own filter
-    def fetch_facet(field, facet_key):
-        # recalculate WHERE clause excluding current field
-        t_where, t_params, k_where, k_params = get_filtered_query_parts(search_query, filters, exclude_field=facet_key)
-        
-        full_params = t_params + k_params
-        
-        # CTE for this specific facet query
-        # Note: We can reuse the same CTE structure but the WHERE clause changes per facet
-        cte_sql = f"""
-            WITH unified_items AS (
-                SELECT 
-                    assigned_to as agent,
-                    status,
-                    ticket_type as category,
-                    subcategory,
-                    customers as customer,
-                    date_action_created as date_val,
-                    0 as is_kb
-                FROM tickets
-                WHERE {t_where}
-                
-                UNION ALL
-                
-                SELECT 
-                    author as agent,
-                    'Canned Response' as status,
-                    kb_parent_category_name as category,
-                    kb_category_name as subcategory,
-                    '' as customer,
-                    COALESCE(date_modified, date_created) as date_val,
-                    1 as is_kb
-                FROM kb.kb_articles
-                WHERE {k_where}
-            )
-            SELECT {field}, COUNT(*) as c 
-            FROM unified_items 
-            WHERE {field} IS NOT NULL AND {field} != '' 
-            GROUP BY {field} 
-            ORDER BY c DESC 
-            LIMIT 50
-        """
-        
+    # Each facet excludes its own filter, so facets whose filter is not set
+    # share the same WHERE clause; count all facets of a clause in one query
+    groups = {}
+    for key in FACET_FIELDS:
+        t_where, t_params, k_where, k_params = get_filtered_query_parts(search_query, filters, exclude_field=key)
+        group = groups.setdefault((t_where, k_where, tuple(t_params + k_params)), [])
+        group.append(key)
+    
+    counts = {key: [] for key in FACET_FIELDS}
+    for (t_where, k_where, params), facet_keys in groups.items():
         try:
-            cursor.execute(cte_sql, full_params)
-            return [(row[0], row[1]) for row in cursor.fetchall()]
+            cursor.execute(build_facet_sql(t_where, k_where, facet_keys), params)
         except sqlite3.OperationalError as e:
-            log_warning(f"Facet error for {field}: {e}")
-            return []
-
-    # 1. Agent (exclude 'agent' filter)
-    facets['agent'] = fetch_facet('agent', 'agent')
-    
-    # 2. Status (exclude 'status' filter)
-    facets['status'] = fetch_facet('status', 'status')
+            log_warning(f"Facet error for {', '.join(facet_keys)}: {e}")
+            continue
+        # Rows arrive ordered by value within each facet
+        for facet, value, c in cursor.fetchall():
+            counts[facet].append((value, c))
     
-    # 3. Category (exclude 'category' filter)
-    facets['category'] = fetch_facet('category', 'category')
-    
-    # 4. Subcategory
-    facets['subcategory'] = fetch_facet('subcategory', 'subcategory')
+    facets = {}
+    for key in FACET_FIELDS:
+        if key in DATE_FACETS:
+            continue
+        # Most frequent first; equal counts in descending value order, as the
+        # per-facet ORDER BY c DESC queries returned them
+        facets[key] = sorted(reversed(counts[key]), key=lambda item: -item[1])[:FACET_LIMIT]
+    
+    # Newest year first (rows without a valid date last)
+    facets['year'] = counts['year'][::-1]
+    
+    facets['month'] = []
+    for value, c in counts['month']:
+        m_idx = int(value) if value and value.isdigit() else 0
+        if 1 <= m_idx <= 12:
+            facets['month'].append((m_idx, calendar.month_name[m_idx], c))
     
-    # 5. Customer
-    # Customer logic slightly different in original (limit 20), but unified generic approach is fine or special case
-    # Let's use the generic fetch_facet but logic on limit is inside query.
-    # We can just use fetch_facet('customer', 'customer') as it limits to 50
-    facets['customer'] = fetch_facet('customer', 'customer')
-
-    # 6. Year
-    # For Year/Month, usually we don't exclude unless we want multi-year Select
-    # Let's exclude for consistency
-    t_where_y, t_params_y, k_where_y, k_params_y = get_filtered_query_parts(search_query, filters, exclude_field='year')
-    sql_year = f"""
-        WITH unified_items AS (
-            SELECT date_action_created as date_val FROM tickets WHERE {t_where_y}
-            UNION ALL
-            SELECT COALESCE(date_modified, date_created) as date_val FROM kb.kb_articles WHERE {k_where_y}
-        )
-        SELECT strftime('%Y', date_val) as y, COUNT(*) as c 
-        FROM unified_items 
-        WHERE date_val IS NOT NULL 
-        GROUP BY y 
-        ORDER BY y DESC
-    """
-    try:
-        cursor.execute(sql_year, t_params_y + k_params_y)
-        facets['year'] = [(row[0], row[1]) for row in cursor.fetchall()]
-    except sqlite3.OperationalError:
-        facets['year'] = []
-
-    # 7. Month (Aggregated)
-    # Reuse year params for simplicity or own exclusion
-    t_where_m, t_params_m, k_where_m, k_params_m = get_filtered_query_parts(search_query, filters, exclude_field='month')
-    sql_month = f"""
-        WITH unified_items AS (
-            SELECT date_action_created as date_val FROM tickets WHERE {t_where_m}
-            UNION ALL
-            SELECT COALESCE(date_modified, date_created) as date_val FROM kb.kb_articles WHERE {k_where_m}
-        )
-        SELECT strftime('%m', date_val) as m, COUNT(*) as c 
-        FROM unified_items 
-        WHERE date_val IS NOT NULL 
-        GROUP BY m 
-        ORDER BY m ASC
-    """
-    try:
-        cursor.execute(sql_month, t_params_m + k_params_m)
-        facets['month'] = []
-        import calendar
-        for row in cursor.fetchall():
-             m_idx = int(row[0]) if row[0] and row[0].isdigit() else 0
-             if 1 <= m_idx <= 12:
-                 name = calendar.month_name[m_idx]
-                 facets['month'].append((m_idx, name, row[1]))
-    except sqlite3.OperationalError:
-         facets['month'] = []
-         
     return facets
 
 
+# (database versions, total count) of the last unfiltered count. The total
+# includes the attached KB, so the key is g.db_version, which versions both
+# teamsupport.db and kb_articles.db.
+_total_count_cache = (None, None)
+
+
 def get_ticket_count(search_query: str = None, filters: dict = None) -> tuple[int, int]:
     """Get total and filtered ticket counts (including KB Articles)."""
+    global _total_count_cache
+    
     db = get_db()
     cursor = db.cursor()
     
-    # Total count (Simple approximation: Tickets + KB total, ignoring filters for 'Total' metric)
-    cursor.execute("SELECT COUNT(*) FROM tickets")
-    tickets_count = cursor.fetchone()[0]
-    
-    kb_count = 0
-    try:
-        cursor.execute("SELECT COUNT(*) FROM kb.kb_articles")
-        kb_count = cursor.fetchone()[0]
-    except sqlite3.Error:
-        pass
+    # Total count (Simple approximation: Tickets + KB total, ignoring filters for 'Total' metric).
+    # It only changes when either database is rebuilt, so it is cached per pair of file versions.
+    cached_version, total = _total_count_cache
+    if total is None or cached_version != g.db_version:
+        cursor.execute("SELECT COUNT(*) FROM tickets")
+        tickets_count = cursor.fetchone()[0]
         
-    total = tickets_count + kb_count
+        kb_count = 0
+        try:
+            cursor.execute("SELECT COUNT(*) FROM kb.kb_articles")
+            kb_count = cursor.fetchone()[0]
+        except sqlite3.Error:
+            pass
+            
+        total = tickets_count + kb_count
+        _total_count_cache = (g.db_version, total)
     
     # Filtered count
     t_where, t_params, k_where, k_params = get_filtered_query_parts(search_query, filters)
@@ -821,6 +848,7 @@ def set_template():
 @app.route('/ticket/<int:ticket_id>/pdf')
 def ticket_pdf(ticket_id: int):
     """Generate and download PDF summary for a ticket."""
+    # Imported on first use: ReportLab is only loaded by workers that build PDFs
     from .generate_pdf import generate_ticket_pdf
     
     log_info(f"PDF download requested", ticket_id=ticket_id)
@@ -835,7 +863,8 @@ def ticket_pdf(ticket_id: int):
     messages = get_ticket_messages(ticket_id)
     
     try:
-        # Generate PDF in memory
+        # Generate PDF in memory. send_file only sets Content-Length and
+        # serves range requests for paths and BytesIO, so keep it a BytesIO.
         pdf_buffer = generate_ticket_pdf(ticket_info, messages)
         log_info(f"PDF generated successfully", ticket_id=ticket_id, message_count=len(messages))
         